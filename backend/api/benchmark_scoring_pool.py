@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк /api/hr/score: пропускная способность при 1, 8 и 32 одновременных запросах.
+
+Сравниваются два режима:
+- subprocess: как было раньше - временный файл и новый интерпретатор python на каждый
+  запрос через блокирующий subprocess.run прямо в корутине
+- pool: прогретый ScoringPool, транскрипт передается в памяти
+
+Вместо Gemini используется фиктивный скорер с задержкой --latency на транскрипт.
+В режиме subprocess дочерний процесс дополнительно спит --import-cost секунд,
+имитируя импорт google.generativeai и чтение промптов.
+
+Запуск: python benchmark_scoring_pool.py [--latency 0.5] [--import-cost 1.0] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from scoring_pool import SCORING_POOL_WORKERS, ScoringPool
+
+CHILD_SCRIPT = """
+import json, sys, time
+time.sleep(float(sys.argv[3]) + float(sys.argv[4]))
+with open(sys.argv[1]) as f:
+    data = json.load(f)
+with open(sys.argv[2], "w") as f:
+    json.dump({"candidate_name": data.get("candidate_name"), "final_score_percent": 80.0}, f)
+"""
+
+
+class FakeScorer:
+    """Имитирует ScoringModelGemini.score: блокирует поток на время вызовов Gemini"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def score(self, transcript_data: dict, progress_callback=None) -> dict:
+        time.sleep(self.latency)
+        return {"candidate_name": transcript_data.get("candidate_name"), "final_score_percent": 80.0}
+
+
+async def score_with_subprocess(data: dict, args) -> dict:
+    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
+        json.dump(data, f)
+        input_path = f.name
+    output_path = input_path.replace(".json", "_score.json")
+    subprocess.run([sys.executable, "-c", CHILD_SCRIPT, input_path, output_path,
+                    str(args.import_cost), str(args.latency)], capture_output=True, text=True)
+    with open(output_path, "r") as f:
+        result = json.load(f)
+    os.remove(input_path)
+    os.remove(output_path)
+    return result
+
+
+async def run_level(mode: str, concurrency: int, args) -> dict:
+    pool = ScoringPool(FakeScorer(args.latency), max_workers=args.workers, max_queue=1000)
+    requests = max(concurrency, args.requests)
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def one_request(index: int):
+        async with in_flight:
+            data = {"candidate_name": f"candidate_{index}", "dialogue_parts": []}
+            if mode == "subprocess":
+                await score_with_subprocess(data, args)
+            else:
+                await pool.score(data)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    pool.executor.shutdown()
+    return {"mode": mode, "concurrency": concurrency, "requests": requests,
+            "seconds": elapsed, "throughput": requests / elapsed}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="время скоринга одного транскрипта, сек")
+    parser.add_argument("--import-cost", type=float, default=1.0, help="старт интерпретатора и импорты, сек")
+    parser.add_argument("--workers", type=int, default=SCORING_POOL_WORKERS, help="SCORING_POOL_WORKERS")
+    parser.add_argument("--requests", type=int, default=16, help="минимум запросов на уровень")
+    args = parser.parse_args()
+
+    print(f"{'режим':<11} {'параллельно':>11} {'запросов':>9} {'время, с':>9} {'запр/с':>8}")
+    for mode in ("subprocess", "pool"):
+        for concurrency in (1, 8, 32):
+            result = await run_level(mode, concurrency, args)
+            print(f"{result['mode']:<11} {result['concurrency']:>11} {result['requests']:>9} "
+                  f"{result['seconds']:>9.2f} {result['throughput']:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
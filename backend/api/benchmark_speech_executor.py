@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: влияние блокирующих вызовов TTS на несвязанные WebSocket сессии.
+
+50 фиктивных сессий одновременно синтезируют речь (блокирующий вызов ~100ms),
+а отдельная "зонд"-сессия каждые 10ms отправляет сообщение и замеряет задержку.
+Сравниваются два режима:
+- inline: синхронный вызов tts_client прямо в корутине (как было раньше)
+- executor: вызов через выделенный пул SpeechExecutor
+
+Запуск: python benchmark_speech_executor.py [--sessions 50] [--turns 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bounded_executor import _percentile
+from speech_executor import SpeechExecutor
+
+
+class FakeBlockingTTSClient:
+    """Имитирует tts_client.synthesize_speech: блокирует поток на время синтеза"""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+
+    def synthesize_speech(self, text: str) -> bytes:
+        time.sleep(self.delay)
+        return text.encode()
+
+
+async def fake_session(client, executor, turns: int):
+    for turn in range(turns):
+        if executor is None:
+            client.synthesize_speech(f"Вопрос {turn}")
+        else:
+            await executor.run(client.synthesize_speech, f"Вопрос {turn}")
+        await asyncio.sleep(0.01)
+
+
+async def probe_session(stop: asyncio.Event, interval: float = 0.01):
+    """Несвязанная сессия: замеряет, насколько позже запланированного она получает управление"""
+    latencies = []
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        latencies.append((time.perf_counter() - expected) * 1000)
+    return latencies
+
+
+async def run_mode(mode: str, sessions: int, turns: int, workers: int):
+    client = FakeBlockingTTSClient()
+    executor = SpeechExecutor(max_workers=workers) if mode == "executor" else None
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_session(stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fake_session(client, executor, turns) for _ in range(sessions)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    latencies = await probe
+    stats = executor.get_statistics() if executor else {}
+    if executor:
+        executor.shutdown()
+    return {
+        "mode": mode,
+        "elapsed_s": round(elapsed, 2),
+        "probe_p50_ms": _percentile(latencies, 50),
+        "probe_p99_ms": _percentile(latencies, 99),
+        "probe_max_ms": round(max(latencies), 1) if latencies else 0.0,
+        "max_queue_depth": stats.get("max_queue_depth", "-")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пула речевых вызовов")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"Сессий: {args.sessions}, реплик: {args.turns}, потоков в пуле: {args.workers}")
+    for mode in ("inline", "executor"):
+        result = asyncio.run(run_mode(mode, args.sessions, args.turns, args.workers))
+        print(f"{result['mode']:>9}: всего {result['elapsed_s']}s, "
+              f"зонд p50={result['probe_p50_ms']}ms p99={result['probe_p99_ms']}ms "
+              f"max={result['probe_max_ms']}ms, макс. очередь={result['max_queue_depth']}")
+
+
+if __name__ == "__main__":
+    main()
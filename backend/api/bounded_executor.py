@@ -0,0 +1,109 @@
+"""
+Ограниченный пул потоков для блокирующих вызовов (Google STT/TTS, скоринг Gemini):
+- фиксированное число рабочих потоков, чтобы медленные вызовы не занимали весь default executor
+- таймаут на каждый вызов; вызов, не дождавшийся старта до таймаута, снимается с очереди
+- метрики: глубина очереди, активные вызовы, таймауты, ошибки, задержки (p50/p99)
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+def _percentile(values, percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+class BoundedExecutor:
+    """Ограниченный пул потоков для блокирующих вызовов с таймаутами и метриками"""
+
+    def __init__(self, max_workers: int, timeout: float, thread_name_prefix: str = "bounded"):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        # Последние замеры (мс): ожидание в очереди и полное время вызова
+        self._wait_ms = deque(maxlen=1000)
+        self._total_ms = deque(maxlen=1000)
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Выполняет блокирующий вызов в пуле; по таймауту поднимает asyncio.TimeoutError"""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        # started/abandoned меняются только под блокировкой: вызов либо стартует, либо снимается с очереди
+        state = {"started": False, "abandoned": False}
+
+        def call():
+            started_at = time.perf_counter()
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+                self.queued -= 1
+                self.active += 1
+                self._wait_ms.append((started_at - submitted_at) * 1000)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        future = asyncio.get_event_loop().run_in_executor(self._pool, call)
+        try:
+            result = await asyncio.wait_for(future, timeout or self.timeout)
+            with self._lock:
+                self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                # Таймаут истек, пока вызов стоял в очереди - снимаем его, он уже никому не нужен
+                if not state["started"]:
+                    state["abandoned"] = True
+                    self.queued -= 1
+                self._total_ms.append((time.perf_counter() - submitted_at) * 1000)
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            wait_ms = list(self._wait_ms)
+            total_ms = list(self._total_ms)
+            return {
+                "max_workers": self.max_workers,
+                "timeout_s": self.timeout,
+                "queue_depth": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "active": self.active,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "queue_wait_p50_ms": _percentile(wait_ms, 50),
+                "queue_wait_p99_ms": _percentile(wait_ms, 99),
+                "call_p50_ms": _percentile(total_ms, 50),
+                "call_p99_ms": _percentile(total_ms, 99)
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,292 @@
+"""
+Конвейер обработки реплик интервью для WebSocket:
+- генерация вопроса (LLM) и синтез речи (TTS) выполняются фоновыми задачами
+- аудио кандидата идет в потоковое распознавание, результаты пересылаются кадрами transcript
+- текст вопроса отправляется клиенту сразу после ответа LLM, аудио - отдельным кадром
+- по мере поступления токенов LLM клиенту уходят кадры question_partial
+- цикл чтения сокета не блокируется, пока идут задачи (audio_chunk, candidate_info, end_interview)
+- для каждой реплики собирается разбивка задержек по стадиям
+- аудио может передаваться бинарными кадрами (audio_protocol=binary или hello с binary_audio),
+  управляющие сообщения при этом остаются JSON; старые клиенты продолжают получать base64 в JSON
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from fastapi import WebSocketDisconnect
+
+
+class TurnLatency:
+    """Разбивка задержек одной реплики по стадиям (миллисекунды от получения реплики)"""
+
+    def __init__(self, question_number: int = 0):
+        self.question_number = question_number
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started_at) * 1000, 1)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Замеряет длительность стадии (llm, tts, stt ...)"""
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[f"{name}_ms"] = round((time.perf_counter() - stage_start) * 1000, 1)
+
+    def mark(self, name: str):
+        """Фиксирует момент события относительно начала реплики"""
+        self.stages[f"{name}_ms"] = self.elapsed_ms()
+
+    def to_dict(self) -> Dict:
+        return {
+            "question_number": self.question_number,
+            "stages": dict(self.stages),
+            "total_ms": self.elapsed_ms()
+        }
+
+
+class InterviewPipeline:
+    """Конвейер STT -> генерация вопроса -> TTS для одного WebSocket соединения"""
+
+    def __init__(self, session, websocket, binary_audio: bool = False):
+        self.session = session
+        self.websocket = websocket
+        # Бинарный протокол аудио: сырые байты в binary кадрах вместо base64 в JSON
+        self.binary_audio = binary_audio
+        # Starlette не допускает параллельную запись в один сокет
+        self._send_lock = asyncio.Lock()
+        # Реплики обрабатываются по очереди, чтобы номера вопросов шли по порядку
+        self._turn_lock = asyncio.Lock()
+        # Задача, пересылающая результаты потокового распознавания текущего ответа
+        self._recognition_task: Optional[asyncio.Task] = None
+        # Последняя задача доставки аудио: следующее аудио ждет ее, чтобы не обогнать
+        self._last_audio_task: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        # Время от конца ответа до финального распознавания (попадает в разбивку реплики)
+        self._last_stt_ms: Optional[float] = None
+        self.latency_log: List[Dict] = []
+
+    async def send_json(self, payload: Dict):
+        """Потокобезопасная (в рамках event loop) отправка JSON кадра"""
+        async with self._send_lock:
+            await self.websocket.send_json(payload)
+
+    async def send_audio(self, audio_data: bytes, text: str, **chunk_info):
+        """
+        Отправка аудио в согласованном формате. В бинарном режиме JSON заголовок и следующий
+        за ним binary кадр отправляются под одной блокировкой, чтобы пары не перемешались.
+        """
+        if not self.binary_audio:
+            await self.send_json(self.session.audio_frame(audio_data, text, **chunk_info))
+            return
+        async with self._send_lock:
+            await self.websocket.send_json({
+                "type": "audio_response",
+                "text": text,
+                "binary": True,
+                "size": len(audio_data),
+                **chunk_info
+            })
+            await self.websocket.send_bytes(audio_data)
+
+    async def receive_message(self) -> Dict:
+        """
+        Чтение следующего сообщения клиента: binary кадр - это сырой аудио фрагмент,
+        текстовый кадр - JSON. Сообщение hello переключает протокол аудио.
+        """
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                return {"type": "audio_chunk", "data": message["bytes"]}
+            if message.get("text") is None:
+                continue
+            data = json.loads(message["text"])
+            if data.get("type") == "hello":
+                self.binary_audio = bool(data.get("binary_audio", False))
+                await self.send_json({
+                    "type": "hello_ack",
+                    "audio_protocol": "binary" if self.binary_audio else "json"
+                })
+                continue
+            return data
+
+    def _track(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    def _on_task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error:
+            print(f"[Pipeline] Ошибка фоновой задачи в сессии {self.session.session_id}: {error}")
+
+    async def submit_audio_chunk(self, audio_data):
+        """Передает аудио фрагмент в VAD и потоковое распознавание, не дожидаясь результата"""
+        await self.session.process_audio_chunk(audio_data)
+        self._ensure_forwarding()
+
+    def _ensure_forwarding(self):
+        # Распознаватель создается сессией на первом пакете речи - подключаем к нему пересылку
+        if self.session.recognizer is not None and self._recognition_task is None:
+            self._recognition_task = self._track(self._forward_recognition(self.session.recognizer))
+
+    def submit_utterance_end(self) -> asyncio.Task:
+        """Кандидат закончил ответ: финальный текст распознавания уходит на генерацию вопроса"""
+        return self._track(self._finish_utterance())
+
+    def submit_turn(self, final_text: str) -> asyncio.Task:
+        """Ставит финальный ответ кандидата на генерацию вопроса и озвучку"""
+        return self._track(self._run_turn(final_text))
+
+    def submit_speech(self, text: str, latency: Optional[TurnLatency] = None) -> asyncio.Task:
+        """Запускает синтез речи отдельной задачей; аудио доставляется в порядке постановки"""
+        previous = self._last_audio_task
+        task = self._track(self._run_tts(text, previous, latency))
+        self._last_audio_task = task
+        return task
+
+    async def _forward_recognition(self, recognizer) -> str:
+        """
+        Пересылает промежуточные результаты распознавания клиенту и возвращает финальный
+        текст ответа. Сегменты хранятся в задаче, чтобы ответы разных реплик не смешивались.
+        """
+        segments: List[str] = []
+        async for result in recognizer.results():
+            text = result["text"].strip()
+            if result["is_final"] and text:
+                segments.append(text)
+                text = ""
+            current = " ".join(segments + ([text] if text else []))
+            if current and not current.startswith("["):
+                await self.send_json({
+                    "type": "transcript",
+                    "text": current,
+                    "is_final": False
+                })
+        return " ".join(segments).strip()
+
+    async def _finish_utterance(self):
+        stt_start = time.perf_counter()
+        self.session.flush_audio()
+        self._ensure_forwarding()
+        self.session.finish_recognition()
+        task, self._recognition_task = self._recognition_task, None
+        final_text = (await task) if task else ""
+        self._last_stt_ms = round((time.perf_counter() - stt_start) * 1000, 1)
+
+        if final_text and not final_text.startswith("["):
+            await self._run_turn(final_text)
+
+    async def _run_turn(self, final_text: str):
+        async with self._turn_lock:
+            latency = TurnLatency()
+            if self._last_stt_ms is not None:
+                latency.stages["stt_ms"] = self._last_stt_ms
+            await self.send_json({
+                "type": "transcript",
+                "text": final_text,
+                "is_final": True
+            })
+
+            with latency.stage("llm"):
+                question = await self._stream_question(final_text, latency)
+            latency.question_number = self.session.question_count
+
+            await self.send_json({
+                "type": "question",
+                "text": question,
+                "question_number": self.session.question_count
+            })
+            latency.mark("question_sent")
+
+        # TTS идет вне блокировки реплики: следующая реплика может уже генерироваться
+        self.submit_speech(question, latency)
+
+    async def _stream_question(self, final_text: str, latency: TurnLatency) -> str:
+        """Пересылает фрагменты вопроса кадрами question_partial и возвращает итоговый текст"""
+        parts = []
+        async for delta in self.session.generate_question_stream(final_text):
+            if not parts:
+                latency.mark("first_token")
+            parts.append(delta)
+            await self.send_json({
+                "type": "question_partial",
+                "delta": delta,
+                "text": "".join(parts),
+                "question_number": self.session.question_count
+            })
+        return self.session.previous_questions[-1] if self.session.previous_questions else "".join(parts).strip()
+
+    async def _run_tts(self, text: str, previous: Optional[asyncio.Task], latency: Optional[TurnLatency]):
+        """Инкрементальный TTS: аудио отправляется по предложениям, как только готово очередное"""
+        tts_start = time.perf_counter()
+        try:
+            async for index, count, segment, audio_data in self.session.generate_audio_stream(text):
+                # Сохраняем порядок доставки аудио между репликами; синтез первого предложения
+                # при этом уже идет параллельно с доставкой предыдущего аудио
+                await self._wait_previous_audio(previous)
+                previous = None
+
+                if audio_data:
+                    await self.send_audio(
+                        audio_data,
+                        segment,
+                        chunk_index=index,
+                        chunk_count=count,
+                        is_last=index == count - 1
+                    )
+                if latency and index == 0:
+                    latency.mark("first_audio_sent")
+        except Exception as e:
+            print(f"[Pipeline] TTS error: {e}")
+        finally:
+            # Даже если синтез ничего не отдал или упал, задача не завершается раньше предыдущей:
+            # иначе аудио следующей реплики обгонит еще отправляемое
+            await self._wait_previous_audio(previous)
+
+        if latency:
+            latency.stages["tts_ms"] = round((time.perf_counter() - tts_start) * 1000, 1)
+            latency.mark("audio_sent")
+            self._report_latency(latency)
+
+    @staticmethod
+    async def _wait_previous_audio(previous: Optional[asyncio.Task]):
+        if previous is None or previous.done():
+            return
+        try:
+            await asyncio.shield(previous)
+        except Exception:
+            pass
+
+    def _report_latency(self, latency: TurnLatency):
+        report = latency.to_dict()
+        self.latency_log.append(report)
+        print(f"[Pipeline] Latency {self.session.session_id} Q{report['question_number']}: "
+              f"{report['stages']} total={report['total_ms']}ms")
+        self._track(self.send_json({"type": "latency", **report}))
+
+    async def drain(self):
+        """Дожидается завершения всех фоновых задач (перед завершением интервью)"""
+        # Незавершенный ответ закрываем, иначе задача распознавания ждет аудио бесконечно
+        self.session.finish_recognition()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def cancel(self):
+        """Отменяет фоновые задачи при отключении клиента"""
+        self.session.finish_recognition()
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
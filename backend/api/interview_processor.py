@@ -15,12 +15,14 @@ from typing import Dict, List, Optional
 import os
 from pathlib import Path
 
+from scoring_pool import ScoringPool
+
 # Добавляем пути к ds модулям
 sys.path.append(str(Path(__file__).parent.parent.parent / "ds2"))
 sys.path.append(str(Path(__file__).parent.parent.parent / "ds3"))
 
 try:
-    from create_transcript import generate_transcript, classify_answer
+    from create_transcript import generate_transcript, classify_answers, prewarm as prewarm_embeddings
     from score_candidate import ScoringModelGemini
     DS_MODULES_AVAILABLE = True
     print("[InterviewProcessor] DS модули подключены")
@@ -47,6 +49,11 @@ class TranscriptProcessor:
         else:
             return self._create_simple_transcript(session_data)
     
+    def prewarm(self):
+        """Фоновая загрузка модели эмбеддингов ds2, чтобы первое интервью не ждало ее"""
+        if DS_MODULES_AVAILABLE:
+            prewarm_embeddings(background=True)
+    
     def _create_transcript_with_ds2(self, session_data: Dict) -> Dict:
         """Создание транскрипта через ds2 модуль"""
         
@@ -65,11 +72,15 @@ class TranscriptProcessor:
             "candidate_name": candidate_name
         }
         
+        # Классифицируем все ответы интервью одним пакетом (пустые ответы - hard_skill)
+        pairs = list(zip(questions, answers))
+        answered = [(question, answer) for question, answer in pairs if answer]
+        answered_categories = iter(classify_answers([q for q, _ in answered], [a for _, a in answered]))
+        categories = [next(answered_categories) if answer else "hard_skill" for _, answer in pairs]
+        
         # Создаем dialogue_parts
         dialogue_parts = []
-        for i, (question, answer) in enumerate(zip(questions, answers)):
-            # Классифицируем ответ
-            assessment_category = classify_answer(answer, vacancy_info) if answer else "hard_skill"
+        for i, ((question, answer), assessment_category) in enumerate(zip(pairs, categories)):
             skill_assessed = f"навык_{i+1}"
             
             dialogue_parts.append({
@@ -175,21 +186,32 @@ class AutoScoringProcessor:
                     experience_prompt = f.read()
                 
                 prompts = {"scoring": scoring_prompt, "experience": experience_prompt}
+                # Шаблон пакетной оценки нужен только для SCORING_BATCH_MODE=true
+                batch_prompt_path = self.base_path / "ds3" / "batch_scoring_prompt.md"
+                if batch_prompt_path.exists():
+                    prompts["batch_scoring"] = batch_prompt_path.read_text(encoding='utf-8')
                 self.scorer = ScoringModelGemini(prompts=prompts, weights=self.weights)
                 print("[AutoScoringProcessor] ds3 scorer инициализирован")
                 
             except Exception as e:
                 print(f"[AutoScoringProcessor] Ошибка инициализации ds3: {e}")
+        
+        # Общий пул для скоринга после интервью и запросов /api/hr/score
+        self.pool = ScoringPool(self.scorer)
     
-    async def run_scoring(self, transcript_data: Dict, session_id: str) -> Dict:
-        """Запускает автоматический скоринг для транскрипта используя ds3"""
+    async def run_scoring(self, transcript_data: Dict, session_id: str, progress=None) -> Dict:
+        """
+        Запускает автоматический скоринг для транскрипта используя ds3.
+        progress(stage, **details) получает события об оценке каждого навыка и записи результата.
+        """
         try:
             print(f"[AutoScoringProcessor] Запуск скоринга для сессии {session_id}")
             
             # Используем ds3 модуль если доступен
             if DS_MODULES_AVAILABLE and self.scorer:
                 try:
-                    score_result = self.scorer.score(transcript_data)
+                    # Скоринг ds3 блокирующий (вызовы Gemini) - выполняем в пуле скоринга вне event loop
+                    score_result = await self.pool.score(transcript_data, progress_callback=progress)
                     print(f"[AutoScoringProcessor] ds3 скоринг завершен")
                 except Exception as e:
                     print(f"[AutoScoringProcessor] Ошибка ds3 скоринга: {e}")
@@ -199,6 +221,8 @@ class AutoScoringProcessor:
             
             # Сохраняем результат скоринга
             score_path = await self._save_score_result(score_result, session_id)
+            if progress:
+                progress("score_saved", final_score_percent=score_result.get("final_score_percent"))
             
             # Записываем результат в Google Sheets
             try:
@@ -208,6 +232,8 @@ class AutoScoringProcessor:
                     results_data=score_result
                 )
                 print("[AutoScoringProcessor] Результат записан в Google Sheets")
+                if progress:
+                    progress("sheet_written")
             except Exception as e:
                 print(f"[AutoScoringProcessor] Ошибка записи в Google Sheets: {e}")
             
@@ -266,13 +292,13 @@ class InterviewAutoProcessor:
         self.scoring_processor = AutoScoringProcessor()
         print("[InterviewAutoProcessor] Инициализирован")
     
-    async def process_completed_interview(self, interview_session):
+    async def process_completed_interview(self, interview_session, progress=None):
         """
         Полная обработка завершенного интервью:
         1. Создание транскрипта
-        2. Автоматический скоринг с ds3
-        3. Запись в Google Sheets
-        4. Возврат результатов
+        2. Автоматический скоринг с ds3 (с записью в Google Sheets)
+        3. Возврат результатов
+        progress(stage, **details) - необязательный приемник событий хода обработки
         """
         try:
             session_id = interview_session.session_id
@@ -290,32 +316,26 @@ class InterviewAutoProcessor:
                 "end_time": interview_session.interview_end_time.isoformat() if interview_session.interview_end_time else None
             }
             
-            # Шаг 1: Создаем транскрипт используя ds2
-            transcript_data = self.transcript_processor.create_transcript(session_data)
+            # Шаг 1: Создаем транскрипт используя ds2 (классификация эмбеддингами - вне event loop)
+            transcript_data = await asyncio.get_event_loop().run_in_executor(
+                None, self.transcript_processor.create_transcript, session_data
+            )
             transcript_path = await self.transcript_processor.save_transcript(
                 transcript_data, 
                 session_id
             )
+            if progress:
+                progress("transcript_built", transcript_path=transcript_path,
+                         dialogue_parts=len(transcript_data.get("dialogue_parts", [])))
             
-            # Шаг 2: Запускаем автоматический скоринг используя ds3
+            # Шаг 2: Запускаем автоматический скоринг используя ds3 (он же пишет результат в Google Sheets)
             scoring_result = await self.scoring_processor.run_scoring(
                 transcript_data,  # Передаем данные напрямую
-                session_id
+                session_id,
+                progress=progress
             )
             
-            # Шаг 3: Записываем результат в Google Sheets
-            try:
-                from google_sheets_service import google_sheets_service
-                if scoring_result.get("success") and scoring_result.get("score_data"):
-                    await google_sheets_service.update_interview_results(
-                        interview_id=session_id,
-                        results_data=scoring_result["score_data"]
-                    )
-                    print(f"[InterviewAutoProcessor] Результат записан в Google Sheets для {session_id}")
-            except Exception as e:
-                print(f"[InterviewAutoProcessor] Ошибка записи в Google Sheets: {e}")
-            
-            # Шаг 4: Формируем итоговый результат
+            # Шаг 3: Формируем итоговый результат
             result = {
                 "session_id": session_id,
                 "status": "completed",
@@ -24,9 +24,7 @@ class ResumeInfo(BaseModel):
 
 from google_sheets import google_sheets_service
 from monitoring_endpoints import router as monitoring_router
-import subprocess
-import tempfile
-from fastapi import FastAPI, UploadFile, File, WebSocket, WebSocketDisconnect, Depends
+from fastapi import FastAPI, UploadFile, File, Form, WebSocket, WebSocketDisconnect, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import json
 from fastapi.responses import FileResponse
@@ -35,12 +33,15 @@ from typing import List, Optional
 import uuid
 from sqlalchemy.orm import Session
 from interview_processor import auto_processor
+from scoring_pool import ScoringPoolBusy
+from resume_ingestion import resume_ingestion, ResumeIngestionBusy, load_analysis
 from datetime import datetime
 
 
 
 import os
 import base64
+import asyncio
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -107,6 +108,8 @@ async def validation_exception_handler(request: Request, exc: RVError):
 class ResumeInfo(BaseModel):
     filename: str
     url: str
+    # Результат разбора при загрузке (телеграм, стаж, обязанности), если он уже готов
+    analysis: Optional[dict] = None
 
 class InterviewCreate(BaseModel):
     position: str
@@ -137,7 +140,8 @@ async def create_interview(data: InterviewCreate):
             print(f"[DEBUG] Processing resume: {resume}")
             resumes_out.append(ResumeInfo(
                 filename=resume.filename,
-                url=resume.url
+                url=resume.url,
+                analysis=resume_context(resume.filename)
             ))
         
         print(f"[DEBUG] Processed resumes: {resumes_out}")
@@ -258,16 +262,33 @@ def get_requirements(interview_id: str):
 
 # WebSocket для интервью
 # Импортируем реальные сервисы
-from speech_service import SpeechService, MLQuestionGenerator
+from speech_service import SpeechService, MLQuestionGenerator, STT_AUDIO_ENCODING
+from voice_activity import VoiceActivityBuffer
+from interview_pipeline import InterviewPipeline
+from streaming_stt import stream_limiter
+from processing_jobs import processing_jobs
+import functools
 
 # Инициализируем реальные сервисы
 speech_service = SpeechService()
 question_generator = MLQuestionGenerator()
-=======
-# Инициализируем реальные сервисы
-speech_service = SpeechService()
-question_generator = MLQuestionGenerator()
->>>>>>> fd9c1e3a04caefd684cd8abbd9c2b1a1516b0d68
+
+# Фиксированные фразы интервью - озвучиваются из кэша TTS
+WELCOME_MESSAGE = "Добро пожаловать на собеседование! Представьтесь, пожалуйста."
+FINAL_MESSAGE = "Спасибо за интервью! Результаты обработаны автоматически и сохранены в Google таблице."
+QUESTION_ERROR_MESSAGE = "Не удалось сгенерировать вопрос. Расскажите подробнее о своем опыте."
+
+@app.on_event("startup")
+async def prewarm_tts_cache():
+    """Прогрев кэша TTS фиксированными фразами в фоне после старта сервера"""
+    phrases = [WELCOME_MESSAGE, FINAL_MESSAGE, QUESTION_ERROR_MESSAGE] + MLQuestionGenerator.FALLBACK_QUESTIONS
+    asyncio.create_task(speech_service.prewarm_tts_cache(phrases))
+
+@app.on_event("startup")
+async def prewarm_embedding_model():
+    """Загрузка модели эмбеддингов ds2 в фоне: сервер готов к запросам, не дожидаясь ее"""
+    if os.getenv("EMBEDDING_PREWARM", "true").lower() == "true":
+        auto_processor.transcript_processor.prewarm()
 
 class InterviewSession:
     def __init__(self, session_id: str, job_description: str = ""):
@@ -281,72 +302,105 @@ class InterviewSession:
         self.candidate_name = "Unknown"  # Добавляем имя кандидата
         self.interview_start_time = None
         self.interview_end_time = None
+        # Потоковый распознаватель текущего ответа (создается на первом пакете речи)
+        self.recognizer = None
+        # VAD: тишина отбрасывается, речь копится пакетами перед отправкой в STT
+        self.vad = VoiceActivityBuffer(encoding=STT_AUDIO_ENCODING)
         
-    async def process_audio_chunk(self, audio_data: bytes) -> str:
-        """Обработка аудио через Google STT"""
+    def start_recognition(self):
+        """Открывает потоковое распознавание для текущего ответа кандидата"""
+        self.recognizer = speech_service.create_streaming_recognizer()
+        self.recognizer.start()
+        return self.recognizer
+    
+    def finish_recognition(self):
+        """Закрывает поток распознавания: оставшиеся результаты придут в recognizer.results()"""
+        recognizer, self.recognizer = self.recognizer, None
+        if recognizer:
+            recognizer.close()
+        return recognizer
+    
+    def _feed_recognizer(self, batches):
+        for batch in batches:
+            if self.recognizer is None:
+                self.start_recognition()
+            self.recognizer.feed(batch)
+    
+    async def process_audio_chunk(self, audio_data: bytes):
+        """Пропускает аудио фрагмент через VAD и передает пакеты речи в потоковое распознавание"""
         try:
-            # Декодируем base64 если нужно
+            # Бинарный протокол присылает сырые байты, JSON протокол - base64 строку
             if isinstance(audio_data, str):
                 audio_data = base64.b64decode(audio_data)
             
-            # Транскрипция через Google STT
-            transcript = await speech_service.transcribe_audio(audio_data, is_final=False)
-            return transcript
+            self._feed_recognizer(self.vad.push(audio_data))
         except Exception as e:
             print(f"[InterviewSession] Audio processing error: {e}")
-            return f"[Ошибка обработки аудио]: {str(e)}"
+    
+    def flush_audio(self):
+        """Конец ответа: остаток речи из VAD уходит в распознавание, хвостовая тишина отбрасывается"""
+        self._feed_recognizer(self.vad.flush())
         
     async def add_candidate_answer(self, answer: str):
         """Добавляет ответ кандидата в историю"""
         self.candidate_answers.append(answer)
         self.transcript_buffer += f" {answer}"
         
-    async def generate_question(self, transcript: str) -> str:
-        """Генерация вопроса через ML модели"""
+    async def generate_question_stream(self, transcript: str):
+        """Потоковая генерация вопроса: отдает фрагменты текста, в историю пишется итоговый вопрос"""
+        self.question_count += 1
+        await self.add_candidate_answer(transcript)
+        
+        parts = []
         try:
-            self.question_count += 1
-            
-            # Добавляем ответ в буфер и историю
-            await self.add_candidate_answer(transcript)
-            
-            # Генерируем вопрос через ML
-            question = await question_generator.generate_question(
+            async for delta in question_generator.generate_question_stream(
                 transcript=transcript,
                 question_number=self.question_count,
                 job_description=self.job_description,
                 previous_questions=self.previous_questions
-            )
-            
-            # Сохраняем вопрос в историю
-            self.previous_questions.append(question)
-            
-            return question
+            ):
+                parts.append(delta)
+                yield delta
         except Exception as e:
-            print(f"[InterviewSession] Question generation error: {e}")
-            return f"Не удалось сгенерировать вопрос. Расскажите подробнее о своем опыте."
+            print(f"[InterviewSession] Question streaming error: {e}")
+        
+        question = "".join(parts).strip()
+        if not question:
+            question = QUESTION_ERROR_MESSAGE
+            yield question
+        self.previous_questions.append(question)
     
-    async def end_interview(self):
-        """Завершает интервью и запускает автоматическую обработку"""
+    async def end_interview(self, progress=None):
+        """Завершает интервью и запускает автоматическую обработку (progress - приемник событий хода обработки)"""
         self.is_active = False
         self.interview_end_time = datetime.now()
+        print(f"[InterviewSession] Статистика аудио {self.session_id}: {self.vad.get_statistics()}")
         
         # Запускаем автоматическую обработку
         try:
-            processing_result = await auto_processor.process_completed_interview(self)
+            processing_result = await auto_processor.process_completed_interview(self, progress=progress)
             print(f"[InterviewSession] Автоматическая обработка завершена: {processing_result}")
             return processing_result
         except Exception as e:
             print(f"[InterviewSession] Ошибка автоматической обработки: {e}")
             return {"error": str(e)}
     
-    async def generate_audio_response(self, text: str) -> bytes:
-        """Генерация аудио ответа через Google TTS"""
+    async def generate_audio_stream(self, text: str):
+        """Инкрементальная генерация аудио по предложениям через Google TTS"""
         try:
-            audio_data = await speech_service.generate_speech(text)
-            return audio_data
+            async for chunk in speech_service.generate_speech_stream(text):
+                yield chunk
         except Exception as e:
-            print(f"[InterviewSession] TTS error: {e}")
-            return b""
+            print(f"[InterviewSession] Incremental TTS error: {e}")
+    
+    def audio_frame(self, audio_data: bytes, text: str, **chunk_info) -> dict:
+        """Формирует кадр audio_response для отправки клиенту"""
+        return {
+            "type": "audio_response",
+            "audio_data": base64.b64encode(audio_data).decode(),
+            "text": text,
+            **chunk_info
+        }
 
 # Храним активные сессии
 active_sessions = {}
@@ -354,8 +408,25 @@ active_sessions = {}
 # Храним завершенные интервью
 completed_interviews = []
 
+async def process_interview_job(session: InterviewSession, job) -> dict:
+    """Фоновое задание: обработка завершенного интервью (не зависит от WebSocket соединения)"""
+    processing_result = await session.end_interview(progress=job.report)
+    
+    # Добавляем завершенное интервью в список
+    completed_interview = {
+        "id": session.session_id,
+        "candidateName": session.candidate_name,
+        "position": session.job_description or "Unknown Position",
+        "status": "completed",
+        "createdAt": session.interview_start_time.strftime("%Y-%m-%d") if session.interview_start_time else datetime.now().strftime("%Y-%m-%d"),
+        "score": processing_result.get("score_data", {}).get("final_score_percent", 0) if processing_result.get("success") else 0,
+        "processing_result": processing_result
+    }
+    completed_interviews.append(completed_interview)
+    return processing_result
+
 @app.websocket("/ws/interview/{session_id}")
-async def interview_ws(websocket: WebSocket, session_id: str, job_description: str = ""):
+async def interview_ws(websocket: WebSocket, session_id: str, job_description: str = "", audio_protocol: str = "json"):
     await websocket.accept()
     print(f"[WebSocket] Подключение {session_id}")
     
@@ -365,109 +436,67 @@ async def interview_ws(websocket: WebSocket, session_id: str, job_description: s
         active_sessions[session_id].interview_start_time = datetime.now()
     
     session = active_sessions[session_id]
+    pipeline = InterviewPipeline(session, websocket, binary_audio=audio_protocol == "binary")
     
     try:
         # Отправляем приветственное сообщение
-        welcome_message = "Добро пожаловать на собеседование! Представьтесь, пожалуйста."
-        await websocket.send_json({
+        welcome_message = WELCOME_MESSAGE
+        await pipeline.send_json({
             "type": "welcome",
             "message": welcome_message
         })
         
-        # Генерируем аудио для приветствия
-        try:
-            audio_data = await session.generate_audio_response(welcome_message)
-            if audio_data:
-                import base64
-                audio_base64 = base64.b64encode(audio_data).decode()
-                await websocket.send_json({
-                    "type": "audio_response",
-                    "audio_data": audio_base64,
-                    "text": welcome_message
-                })
-        except Exception as e:
-            print(f"[WebSocket] TTS error: {e}")
+        # Генерируем аудио для приветствия в фоне, не задерживая чтение сокета
+        pipeline.submit_speech(welcome_message)
         
         while session.is_active:
-            # Принимаем данные от клиента
-            message = await websocket.receive_json()
+            # Принимаем данные от клиента (JSON или бинарный аудио кадр)
+            message = await pipeline.receive_message()
             
             if message["type"] == "audio_chunk":
-                # Обрабатываем аудио через STT
-                audio_data = message.get("data", "")
-                transcript = await session.process_audio_chunk(audio_data)
+                # Передаем аудио в потоковое распознавание
+                await pipeline.submit_audio_chunk(message.get("data", ""))
                 
-                # Отправляем промежуточный транскрипт
-                if transcript and not transcript.startswith("["):
-                    await websocket.send_json({
-                        "type": "transcript",
-                        "text": transcript,
-                        "is_final": False
-                    })
+            elif message["type"] == "recording_finished":
+                # Кандидат закончил ответ - дожидаемся финального распознавания и генерируем вопрос
+                pipeline.submit_utterance_end()
                 
             elif message["type"] == "final_transcript":
-                # Финальный транскрипт - генерируем вопрос
+                # Финальный транскрипт - генерируем вопрос и аудио в конвейере
                 final_text = message.get("text", "")
                 
                 if final_text.strip():
-                    # Отправляем финальный транскрипт
-                    await websocket.send_json({
-                        "type": "transcript",
-                        "text": final_text,
-                        "is_final": True
-                    })
-                    
-                    # Генерируем и отправляем вопрос
-                    question = await session.generate_question(final_text)
-                    await websocket.send_json({
-                        "type": "question",
-                        "text": question,
-                        "question_number": session.question_count
-                    })
-                    
-                    # Генерируем аудио ответ
-                    try:
-                        audio_data = await session.generate_audio_response(question)
-                        if audio_data:
-                            audio_base64 = base64.b64encode(audio_data).decode()
-                            await websocket.send_json({
-                                "type": "audio_response",
-                                "audio_data": audio_base64,
-                                "text": question
-                            })
-                    except Exception as e:
-                        print(f"[WebSocket] TTS error for question: {e}")
+                    pipeline.submit_turn(final_text)
                 
             elif message["type"] == "candidate_info":
                 # Получаем информацию о кандидате
                 session.candidate_name = message.get("name", "Unknown")
-                await websocket.send_json({
+                await pipeline.send_json({
                     "type": "info_received",
                     "message": f"Добро пожаловать, {session.candidate_name}!"
                 })
                 
             elif message["type"] == "end_interview":
-                # Завершаем интервью и запускаем автоматическую обработку
-                processing_result = await session.end_interview()
-                
-                # Добавляем завершенное интервью в список
-                completed_interview = {
-                    "id": session_id,
-                    "candidateName": session.candidate_name,
-                    "position": session.job_description or "Unknown Position",
-                    "status": "completed",
-                    "createdAt": session.interview_start_time.strftime("%Y-%m-%d") if session.interview_start_time else datetime.now().strftime("%Y-%m-%d"),
-                    "score": processing_result.get("score_data", {}).get("final_score_percent", 0) if processing_result.get("success") else 0,
-                    "processing_result": processing_result
-                }
-                completed_interviews.append(completed_interview)
+                # Дожидаемся текущих реплик, затем ставим обработку в фоновое задание
+                await pipeline.drain()
+                job = processing_jobs.submit(session_id, functools.partial(process_interview_job, session))
                 
                 end_message = "Интервью завершено. Начинается автоматическая обработка результатов..."
-                await websocket.send_json({
+                await pipeline.send_json({
                     "type": "interview_ended",
-                    "message": end_message
+                    "message": end_message,
+                    "job_id": job.job_id,
+                    "status_url": f"/api/interview/jobs/{job.job_id}"
                 })
                 
+                # Пересылаем прогресс обработки, пока клиент подключен
+                async def forward_progress(event):
+                    await pipeline.send_json({"type": "processing_progress", "job_id": job.job_id, **event})
+                
+                job.subscribe(forward_progress)
+                processing_result = await job.wait() or {"error": job.error}
+                job.unsubscribe(forward_progress)
+                
                 # Отправляем результат автоматической обработки с ссылкой на Google Sheets
                 try:
                     google_sheets_url = await google_sheets_service.get_interview_sheet_url(session_id)
@@ -476,26 +505,18 @@ async def interview_ws(websocket: WebSocket, session_id: str, job_description: s
                 except:
                     google_sheets_url = f"https://docs.google.com/spreadsheets/d/demo_{session_id}/edit"
                 
-                await websocket.send_json({
+                await pipeline.send_json({
                     "type": "processing_completed",
+                    "job_id": job.job_id,
                     "processing_result": processing_result,
                     "results_url": google_sheets_url,
                     "redirect_to": f"/hr/results?interview_id={session_id}"
                 })
                 
                 # Генерируем аудио для завершения
-                try:
-                    final_message = "Спасибо за интервью! Результаты обработаны автоматически и сохранены в Google таблице."
-                    audio_data = await session.generate_audio_response(final_message)
-                    if audio_data:
-                        audio_base64 = base64.b64encode(audio_data).decode()
-                        await websocket.send_json({
-                            "type": "audio_response",
-                            "audio_data": audio_base64,
-                            "text": final_message
-                        })
-                except Exception as e:
-                    print(f"[WebSocket] TTS error for end: {e}")
+                final_message = FINAL_MESSAGE
+                pipeline.submit_speech(final_message)
+                await pipeline.drain()
                 
                 break
                 
@@ -506,14 +527,34 @@ async def interview_ws(websocket: WebSocket, session_id: str, job_description: s
         import traceback
         traceback.print_exc()
     finally:
-        # Очищаем сессию при отключении
+        # Останавливаем фоновые задачи и очищаем сессию при отключении
+        pipeline.cancel()
         if session_id in active_sessions:
             del active_sessions[session_id]
 
 
+def resume_context(filename: str) -> Optional[dict]:
+    """Краткий контекст резюме из результата разбора при загрузке"""
+    record = load_analysis(os.path.join(UPLOAD_DIR, filename))
+    if not record:
+        return None
+    return {
+        "telegram": record.get("telegram"),
+        "total_experience_years": record["resume_info"].get("total_experience_years"),
+        "responsibilities": record["resume_info"].get("responsibilities")
+    }
+
 # Множественная загрузка файлов
 @app.post("/api/hr/upload-multi")
-async def upload_files(files: List[UploadFile] = File(...)):
+async def upload_files(files: List[UploadFile] = File(...), kind: str = Form("file")):
+    # PDF резюме (kind=resume) сразу ставятся в очередь разбора; вакансии и прочие файлы
+    # только сохраняются. Если очередь заполнена, загрузка резюме отклоняется целиком
+    parse_resumes = kind == "resume"
+    pdf_count = sum(1 for file in files if file.filename.lower().endswith(".pdf")) if parse_resumes else 0
+    try:
+        resume_ingestion.ensure_capacity(pdf_count)
+    except ResumeIngestionBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
     try:
         print(f"[DEBUG] upload-multi called with {len(files)} files")
         print("[DEBUG] upload-multi files:", [file.filename for file in files])
@@ -525,9 +566,18 @@ async def upload_files(files: List[UploadFile] = File(...)):
                 content = await file.read()
                 f.write(content)
                 print(f"[DEBUG] File saved: {file_location}, size: {len(content)} bytes")
+            ingestion = None
+            if parse_resumes and file.filename.lower().endswith(".pdf"):
+                try:
+                    ingestion = resume_ingestion.submit(file.filename, file_location).to_dict()
+                    ingestion["status_url"] = f"/api/hr/file/{file.filename}/ingestion"
+                except ResumeIngestionBusy as e:
+                    # Очередь успели занять параллельные загрузки - файл сохранен, но не разобран
+                    ingestion = {"filename": file.filename, "status": "rejected", "error": str(e)}
             result.append({
                 "filename": file.filename,
-                "url": f"/api/hr/file/{file.filename}"
+                "url": f"/api/hr/file/{file.filename}",
+                "ingestion": ingestion
             })
         print(f"[DEBUG] upload-multi result: {result}")
         return {"files": result}
@@ -535,7 +585,6 @@ async def upload_files(files: List[UploadFile] = File(...)):
         import traceback
         print("[ERROR] /api/hr/upload-multi:", e)
         traceback.print_exc()
-        from fastapi import HTTPException
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/hr/file/{filename}")
@@ -545,6 +594,25 @@ def get_uploaded_file(filename: str):
         return {"error": "Файл не найден"}
     return FileResponse(file_location, media_type="application/octet-stream", filename=filename)
 
+@app.get("/api/hr/file/{filename}/ingestion")
+async def get_file_ingestion_status(filename: str):
+    """Статус разбора загруженного резюме: queued, processing, completed, error"""
+    status = resume_ingestion.get(filename)
+    if status:
+        return status.to_dict()
+    # После перезапуска сервера статусов в памяти нет, но результат разбора остается на диске
+    if load_analysis(os.path.join(UPLOAD_DIR, filename)):
+        return {"filename": filename, "status": "completed", "analysis_url": f"/api/hr/file/{filename}/analysis"}
+    return {"error": "Файл не ставился в очередь разбора"}
+
+@app.get("/api/hr/file/{filename}/analysis")
+async def get_file_analysis(filename: str):
+    """Полный результат разбора резюме (ds2 analyze_resume)"""
+    record = load_analysis(os.path.join(UPLOAD_DIR, filename))
+    if not record:
+        return {"error": "Результат разбора не найден"}
+    return record
+
 # Тестовый эндпоинт для проверки Google Sheets
 @app.get("/api/test/google-sheets")
 async def test_google_sheets():
@@ -664,6 +732,37 @@ async def clear_google_sheets_logs():
             "message": f"Ошибка очистки логов: {str(e)}"
         }
 
+@app.get("/api/debug/tts-cache/stats")
+async def get_tts_cache_statistics():
+    """Получить статистику кэша синтезированной речи"""
+    try:
+        return {
+            "status": "success",
+            "statistics": speech_service.tts_cache.get_statistics()
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Ошибка получения статистики: {str(e)}"
+        }
+
+@app.get("/api/debug/speech-executor/stats")
+async def get_speech_executor_statistics():
+    """Получить метрики пула речевых вызовов (очередь, таймауты, задержки)"""
+    try:
+        return {
+            "status": "success",
+            "statistics": {
+                **speech_service.executor.get_statistics(),
+                "streaming_stt": stream_limiter.get_statistics()
+            }
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Ошибка получения статистики: {str(e)}"
+        }
+
 @app.get("/debug/google-sheets")
 async def google_sheets_monitor():
     """Страница мониторинга Google Sheets"""
@@ -677,6 +776,22 @@ async def google_sheets_monitor():
 
 # Заглушки для хранения
 
+@app.get("/api/interview/jobs/{job_id}")
+async def get_processing_job(job_id: str):
+    """Статус и события фонового задания обработки интервью"""
+    job = processing_jobs.get(job_id)
+    if not job:
+        return {"error": "Задание не найдено"}
+    return job.to_dict()
+
+@app.get("/api/interview/{session_id}/processing")
+async def get_session_processing_job(session_id: str):
+    """Последнее задание обработки для сессии интервью"""
+    job = processing_jobs.find_by_session(session_id)
+    if not job:
+        return {"error": "Задание для сессии не найдено"}
+    return job.to_dict()
+
 @app.get("/api/interview/{session_id}/results")
 async def get_interview_results(session_id: str):
     """Получить результаты обработки интервью"""
@@ -715,30 +830,38 @@ async def get_interview_results(session_id: str):
 
 @app.post("/api/hr/score")
 async def score_candidate(data: dict):
-    # Сохраняем входные данные во временный файл
-    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-        json.dump(data, f)
-        input_path = f.name
-    output_path = input_path.replace(".json", "_score.json")
-    # Запускаем скоринг-скрипт
-    result = subprocess.run([
-        "python", "../../ds3/score_candidate.py", input_path, output_path
-    ], capture_output=True, text=True)
-    if result.returncode != 0:
-        return {"error": "Ошибка скоринга", "details": result.stderr}
-    # Читаем результат
-    with open(output_path, "r") as f:
-        score_data = json.load(f)
+    """Скоринг транскрипта в прогретом пуле ds3 (без запуска отдельного процесса на запрос)"""
+    scoring_pool = auto_processor.scoring_processor.pool
+    if not scoring_pool.available:
+        return {"error": "Ошибка скоринга", "details": "Модуль скоринга ds3 недоступен"}
+    try:
+        score_data = await scoring_pool.score(data)
+    except ScoringPoolBusy as e:
+        return {"error": "Сервис скоринга перегружен, повторите запрос позже", "details": str(e)}
+    except asyncio.TimeoutError:
+        return {"error": "Ошибка скоринга", "details": f"Превышено время ожидания ({scoring_pool.executor.timeout}s)"}
+    except Exception as e:
+        return {"error": "Ошибка скоринга", "details": str(e)}
     # Записываем результат в Google Sheets
     try:
         await google_sheets_service.update_interview_results(
-            interview_id="current_interview",  # В реальности здесь ID из контекста
+            interview_id=data.get("interview_id", "current_interview"),
             results_data=score_data
         )
     except Exception as e:
         print(f"Ошибка записи в Google Sheets: {e}")
     return score_data
 
+@app.get("/api/debug/scoring-pool/stats")
+async def get_scoring_pool_stats():
+    """Метрики пула скоринга: очередь, активные оценки, таймауты, отказы"""
+    return auto_processor.scoring_processor.pool.get_statistics()
+
+@app.get("/api/debug/resume-ingestion/stats")
+async def get_resume_ingestion_stats():
+    """Метрики очереди разбора резюме: ожидающие файлы, отказы, статусы"""
+    return resume_ingestion.get_statistics()
+
 # Регистрируем роутер мониторинга Google Sheets
 app.include_router(monitoring_router)
 
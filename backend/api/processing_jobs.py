@@ -0,0 +1,142 @@
+"""
+Фоновые задания обработки завершенных интервью:
+- end_interview не держит WebSocket: задание ставится в очередь и сразу возвращает job_id
+- ход выполнения (транскрипт построен, навык оценен, результат записан) публикуется событиями
+- события пересылаются в сокет, пока клиент подключен, и доступны по REST в любой момент
+"""
+
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+PROCESSING_MAX_CONCURRENT_JOBS = int(os.getenv("PROCESSING_MAX_CONCURRENT_JOBS", "2"))
+# Сколько завершенных заданий хранить для опроса по REST
+PROCESSING_JOBS_KEPT = int(os.getenv("PROCESSING_JOBS_KEPT", "200"))
+
+
+class ProcessingJob:
+    """Задание обработки одного интервью"""
+
+    def __init__(self, session_id: str):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.status = "queued"
+        self.events: List[Dict] = []
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self._loop = asyncio.get_event_loop()
+        self._done = asyncio.Event()
+        self._listeners: List[Callable[[Dict], Awaitable[None]]] = []
+
+    def report(self, stage: str, **details):
+        """
+        Публикует событие прогресса. Безопасно вызывать из рабочих потоков
+        (скоринг ds3 идет в executor) - событие доставляется через event loop.
+        """
+        event = {"stage": stage, "timestamp": datetime.now().isoformat(), **details}
+        self._loop.call_soon_threadsafe(self._publish, event)
+
+    def _publish(self, event: Dict):
+        self.events.append(event)
+        for listener in list(self._listeners):
+            asyncio.ensure_future(self._notify(listener, event))
+
+    async def _notify(self, listener, event: Dict):
+        try:
+            await listener(event)
+        except Exception:
+            # Клиент отключился - дальше события доступны только по REST
+            self.unsubscribe(listener)
+
+    def subscribe(self, listener: Callable[[Dict], Awaitable[None]]):
+        """Подписка на события; уже случившиеся события доставляются сразу"""
+        self._listeners.append(listener)
+        for event in list(self.events):
+            asyncio.ensure_future(self._notify(listener, event))
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def wait(self) -> Optional[Dict]:
+        await self._done.wait()
+        return self.result
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "events": list(self.events),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class ProcessingJobRunner:
+    """Очередь заданий обработки с ограничением числа одновременно выполняемых"""
+
+    def __init__(self, max_concurrent: int = PROCESSING_MAX_CONCURRENT_JOBS, max_kept: int = PROCESSING_JOBS_KEPT):
+        self.max_concurrent = max_concurrent
+        self.max_kept = max_kept
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, ProcessingJob]" = OrderedDict()
+        self._tasks: set = set()
+
+    def submit(self, session_id: str, work: Callable[[ProcessingJob], Awaitable[Dict]]) -> ProcessingJob:
+        """Ставит задание в очередь и сразу возвращает его (без ожидания выполнения)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        job = ProcessingJob(session_id)
+        self._jobs[job.job_id] = job
+        self._evict_finished()
+        task = asyncio.ensure_future(self._run(job, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        print(f"[ProcessingJobs] Задание {job.job_id} для сессии {session_id} поставлено в очередь")
+        return job
+
+    async def _run(self, job: ProcessingJob, work):
+        async with self._semaphore:
+            job.status = "running"
+            job.report("started")
+            try:
+                job.result = await work(job)
+                job.status = "completed"
+            except Exception as e:
+                job.status = "error"
+                job.error = str(e)
+                print(f"[ProcessingJobs] Ошибка задания {job.job_id}: {e}")
+            finally:
+                job.finished_at = datetime.now().isoformat()
+                job.report(job.status)
+                # Финальное событие должно уйти подписчикам раньше, чем ожидающие узнают о завершении
+                job._loop.call_soon(job._done.set)
+
+    def get(self, job_id: str) -> Optional[ProcessingJob]:
+        return self._jobs.get(job_id)
+
+    def find_by_session(self, session_id: str) -> Optional[ProcessingJob]:
+        for job in reversed(list(self._jobs.values())):
+            if job.session_id == session_id:
+                return job
+        return None
+
+    def _evict_finished(self):
+        while len(self._jobs) > self.max_kept:
+            oldest_id = next((job_id for job_id, job in self._jobs.items() if job._done.is_set()), None)
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+
+processing_jobs = ProcessingJobRunner()
@@ -0,0 +1,211 @@
+"""
+Обработка резюме сразу при загрузке:
+- /api/hr/upload-multi с kind=resume ставит каждый PDF резюме в очередь и не ждет разбора
+- разбор (ds2 resume_analyzer: текст, телеграм, стаж, обязанности) идет в пуле процессов
+- результат сохраняется рядом с файлом (<имя>.analysis.json); неизмененный файл повторно не разбирается
+- при заполненной очереди новые файлы не принимаются (ResumeIngestionBusy), статус каждого файла доступен по REST
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Добавляем путь к ds2 (resume_analyzer, pdf_parser); рабочие процессы наследуют его
+sys.path.append(str(Path(__file__).parent.parent.parent / "ds2"))
+
+RESUME_INGEST_WORKERS = int(os.getenv("RESUME_INGEST_WORKERS", "2"))
+# Сколько файлов может ждать разбора и разбираться одновременно; дальше загрузка отклоняется
+RESUME_INGEST_MAX_QUEUE = int(os.getenv("RESUME_INGEST_MAX_QUEUE", "64"))
+# Сколько статусов завершенных файлов хранить в памяти
+RESUME_INGEST_KEPT = int(os.getenv("RESUME_INGEST_KEPT", "500"))
+ANALYSIS_SUFFIX = ".analysis.json"
+
+
+class ResumeIngestionBusy(Exception):
+    """Очередь разбора резюме заполнена - загрузку нужно повторить позже"""
+
+
+def analysis_path_for(file_path: str) -> str:
+    return f"{file_path}{ANALYSIS_SUFFIX}"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_analysis(file_path: str) -> Optional[Dict]:
+    """Сохраненный результат разбора файла или None"""
+    try:
+        with open(analysis_path_for(file_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _summary(record: Dict, cached: bool) -> Dict:
+    return {
+        "telegram": record.get("telegram"),
+        "total_experience_years": record.get("resume_info", {}).get("total_experience_years"),
+        "responsibilities_count": len(record.get("resume_info", {}).get("responsibilities") or []),
+        "pages": record.get("pages"),
+        "cached": cached
+    }
+
+
+def ingest_resume_file(file_path: str) -> Dict:
+    """
+    Разбирает одно резюме и сохраняет результат рядом с файлом; выполняется в рабочем процессе.
+    Если файл не менялся с прошлого разбора, возвращается сохраненный результат.
+    """
+    from resume_analyzer import analyze_resume
+
+    content_sha256 = _file_sha256(file_path)
+    existing = load_analysis(file_path)
+    if existing and existing.get("content_sha256") == content_sha256:
+        return _summary(existing, cached=True)
+
+    record = analyze_resume(file_path)
+    record["content_sha256"] = content_sha256
+    record["analyzed_at"] = datetime.now().isoformat()
+    # Запись через временный файл: читатель не увидит недописанный JSON
+    tmp_path = f"{analysis_path_for(file_path)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, analysis_path_for(file_path))
+    return _summary(record, cached=False)
+
+
+class IngestionStatus:
+    """Состояние разбора одного загруженного файла"""
+
+    def __init__(self, filename: str, file_path: str):
+        self.filename = filename
+        self.file_path = file_path
+        self.status = "queued"
+        self.summary: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.queued_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict:
+        return {
+            "filename": self.filename,
+            "status": self.status,
+            "summary": self.summary,
+            "error": self.error,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "analysis_url": f"/api/hr/file/{self.filename}/analysis" if self.status == "completed" else None
+        }
+
+
+class ResumeIngestionQueue:
+    """Очередь разбора резюме с ограниченным пулом процессов и лимитом ожидающих файлов"""
+
+    def __init__(
+        self,
+        max_workers: int = RESUME_INGEST_WORKERS,
+        max_queue: int = RESUME_INGEST_MAX_QUEUE,
+        max_kept: int = RESUME_INGEST_KEPT,
+        ingest: Callable[[str], Dict] = ingest_resume_file,
+        executor: Optional[Executor] = None
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_kept = max_kept
+        self.ingest = ingest
+        # Разбор PDF упирается в CPU (pdfplumber) - по умолчанию процессы, а не потоки
+        self._executor = executor
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._statuses: "OrderedDict[str, IngestionStatus]" = OrderedDict()
+        self._tasks: set = set()
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        """Файлы в очереди и в разборе"""
+        return len(self._tasks)
+
+    def has_capacity(self, count: int = 1) -> bool:
+        return self.pending + count <= self.max_queue
+
+    def ensure_capacity(self, count: int = 1):
+        """Поднимает ResumeIngestionBusy, если в очереди нет места для count файлов"""
+        if not self.has_capacity(count):
+            self.rejected += count
+            raise ResumeIngestionBusy(
+                f"Очередь разбора резюме заполнена ({self.pending}/{self.max_queue}), повторите загрузку позже"
+            )
+
+    def submit(self, filename: str, file_path: str) -> IngestionStatus:
+        self.ensure_capacity()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        status = IngestionStatus(filename, file_path)
+        # Повторная загрузка файла с тем же именем заменяет прежний статус
+        self._statuses.pop(filename, None)
+        self._statuses[filename] = status
+        self._evict_finished()
+        task = asyncio.ensure_future(self._run(status))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        print(f"[ResumeIngestion] {filename} поставлен в очередь разбора ({self.pending}/{self.max_queue})")
+        return status
+
+    async def _run(self, status: IngestionStatus):
+        async with self._semaphore:
+            status.status = "processing"
+            status.started_at = datetime.now().isoformat()
+            try:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                loop = asyncio.get_event_loop()
+                status.summary = await loop.run_in_executor(self._executor, self.ingest, status.file_path)
+                status.status = "completed"
+                print(f"[ResumeIngestion] {status.filename} разобран: {status.summary}")
+            except Exception as e:
+                status.status = "error"
+                status.error = str(e)
+                print(f"[ResumeIngestion] Ошибка разбора {status.filename}: {e}")
+            finally:
+                status.finished_at = datetime.now().isoformat()
+                status.done.set()
+
+    def get(self, filename: str) -> Optional[IngestionStatus]:
+        return self._statuses.get(filename)
+
+    def _evict_finished(self):
+        while len(self._statuses) > self.max_kept:
+            oldest = next((name for name, status in self._statuses.items() if status.done.is_set()), None)
+            if oldest is None:
+                break
+            del self._statuses[oldest]
+
+    def get_statistics(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for status in self._statuses.values():
+            counts[status.status] = counts.get(status.status, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "statuses": counts
+        }
+
+
+resume_ingestion = ResumeIngestionQueue()
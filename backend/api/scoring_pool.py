@@ -0,0 +1,60 @@
+"""
+Пул скоринга кандидатов внутри процесса backend:
+- ScoringModelGemini загружается один раз (промпты, клиент Gemini) и переиспользуется
+- транскрипт передается в памяти, без временных файлов и запуска отдельного интерпретатора
+- ограничение числа одновременных оценок, очередь с лимитом и таймаут на запрос
+"""
+
+import os
+from typing import Callable, Dict, Optional
+
+from bounded_executor import BoundedExecutor
+
+SCORING_POOL_WORKERS = int(os.getenv("SCORING_POOL_WORKERS", "4"))
+# Сколько запросов может ждать в очереди сверх работающих; дальше - отказ "пул перегружен"
+SCORING_POOL_MAX_QUEUE = int(os.getenv("SCORING_POOL_MAX_QUEUE", "32"))
+SCORING_REQUEST_TIMEOUT = float(os.getenv("SCORING_REQUEST_TIMEOUT", "180"))
+
+
+class ScoringPoolBusy(Exception):
+    """Очередь скоринга заполнена - запрос нужно повторить позже"""
+
+
+class ScoringPool:
+    """Ограниченный пул потоков с заранее загруженным скорером"""
+
+    def __init__(
+        self,
+        scorer,
+        max_workers: int = SCORING_POOL_WORKERS,
+        max_queue: int = SCORING_POOL_MAX_QUEUE,
+        timeout: float = SCORING_REQUEST_TIMEOUT
+    ):
+        self.scorer = scorer
+        self.max_queue = max_queue
+        self.executor = BoundedExecutor(max_workers=max_workers, timeout=timeout, thread_name_prefix="scoring")
+        self.rejected = 0
+
+    @property
+    def available(self) -> bool:
+        return self.scorer is not None
+
+    async def score(self, transcript_data: Dict, progress_callback: Optional[Callable] = None) -> Dict:
+        """
+        Оценивает транскрипт. Поднимает ScoringPoolBusy при переполнении очереди
+        и asyncio.TimeoutError по таймауту (начатый вызов Gemini при этом не прерывается).
+        """
+        if self.scorer is None:
+            raise RuntimeError("Скорер ds3 не инициализирован")
+        if self.executor.queued >= self.max_queue:
+            self.rejected += 1
+            raise ScoringPoolBusy(f"Очередь скоринга заполнена ({self.max_queue})")
+        return await self.executor.run(self.scorer.score, transcript_data, progress_callback=progress_callback)
+
+    def get_statistics(self) -> Dict:
+        return {
+            "available": self.available,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            **self.executor.get_statistics()
+        }
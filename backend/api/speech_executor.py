@@ -0,0 +1,23 @@
+"""
+Выделенный пул потоков для блокирующих вызовов Google STT/TTS:
+- ограниченное число рабочих потоков, чтобы медленный TTS не занимал весь default executor
+- таймаут на каждый вызов
+- метрики: глубина очереди, активные вызовы, таймауты, ошибки, задержки (p50/p99)
+"""
+
+import os
+
+from bounded_executor import BoundedExecutor
+
+SPEECH_EXECUTOR_WORKERS = int(os.getenv("SPEECH_EXECUTOR_WORKERS", "8"))
+SPEECH_CALL_TIMEOUT = float(os.getenv("SPEECH_CALL_TIMEOUT", "15"))
+
+
+class SpeechExecutor(BoundedExecutor):
+    """Ограниченный пул потоков для речевых вызовов с таймаутами и метриками"""
+
+    def __init__(self, max_workers: int = SPEECH_EXECUTOR_WORKERS, timeout: float = SPEECH_CALL_TIMEOUT):
+        super().__init__(max_workers=max_workers, timeout=timeout, thread_name_prefix="speech")
+
+
+speech_executor = SpeechExecutor()
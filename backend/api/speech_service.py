@@ -1,8 +1,9 @@
 import os
+import re
 import json
 import base64
 import asyncio
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List
 import tempfile
 import io
 from dotenv import load_dotenv
@@ -34,11 +35,52 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("Google Generative AI library not available.")
 
+from tts_cache import tts_cache
+from speech_executor import speech_executor
+from streaming_stt import StreamingRecognizer, GoogleStreamingRecognizer, FakeStreamingRecognizer
+
+# Формат аудио, которое присылает клиент (MediaRecorder: webm/opus)
+STT_AUDIO_ENCODING = "WEBM_OPUS"
+
+# Параметры голоса TTS (входят в ключ кэша аудио)
+TTS_LANGUAGE_CODE = "ru-RU"
+TTS_VOICE_NAME = "ru-RU-Standard-A"
+TTS_AUDIO_ENCODING = "MP3"
+
+# Инкрементальный TTS: сколько предложений синтезируется одновременно
+TTS_SENTENCE_CONCURRENCY = int(os.getenv("TTS_SENTENCE_CONCURRENCY", "3"))
+# Короткие предложения ("Отлично.") склеиваются со следующими, чтобы не плодить TTS вызовы
+TTS_MIN_SEGMENT_CHARS = 20
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+')
+
+
+def split_into_sentences(text: str, min_chars: int = TTS_MIN_SEGMENT_CHARS) -> List[str]:
+    """Разбивает текст на сегменты по границам предложений для инкрементального синтеза"""
+    segments = []
+    buffer = ""
+    for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+        if not sentence:
+            continue
+        buffer = f"{buffer} {sentence}" if buffer else sentence
+        if len(buffer) >= min_chars:
+            segments.append(buffer)
+            buffer = ""
+    if buffer:
+        if segments and len(buffer) < min_chars:
+            segments[-1] = f"{segments[-1]} {buffer}"
+        else:
+            segments.append(buffer)
+    return segments
+
 
 class SpeechService:
     def __init__(self):
         self.stt_client = None
         self.tts_client = None
+        self.tts_cache = tts_cache
+        # Блокирующие вызовы Google STT/TTS выполняются в выделенном пуле с таймаутом
+        self.executor = speech_executor
         
         if GOOGLE_AVAILABLE:
             try:
@@ -97,86 +139,161 @@ class SpeechService:
             else:
                 print("[SpeechService] OpenAI API key not provided or placeholder")
     
-    async def transcribe_audio(self, audio_data: bytes, is_final: bool = False) -> str:
+    def _recognition_config(self):
+        """Конфигурация распознавания для потоковых запросов"""
+        return speech.RecognitionConfig(
+            encoding=getattr(speech.RecognitionConfig.AudioEncoding, STT_AUDIO_ENCODING),
+            sample_rate_hertz=48000,
+            language_code="ru-RU",
+            alternative_language_codes=["en-US"],
+            enable_automatic_punctuation=True,
+            enable_word_time_offsets=False,
+            model="latest_long"
+        )
+    
+    def create_streaming_recognizer(self) -> StreamingRecognizer:
         """
-        Транскрипция аудио в текст
+        Потоковый распознаватель для одного соединения: Google streaming_recognize,
+        либо локальный FakeStreamingRecognizer, если Google STT недоступен
         """
         if not self.stt_client:
-            # Заглушка если Google STT недоступен
-            return f"[MOCK STT] Обработано {len(audio_data)} байт аудио"
+            return FakeStreamingRecognizer()
         
-        try:
-            # Конфигурация для STT
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-                sample_rate_hertz=48000,
-                language_code="ru-RU",
-                alternative_language_codes=["en-US"],
-                enable_automatic_punctuation=True,
-                enable_word_time_offsets=False,
-                model="latest_long"
-            )
-            
-            # Создаем объект аудио
-            audio = speech.RecognitionAudio(content=audio_data)
-            
-            # Выполняем транскрипцию
-            response = self.stt_client.recognize(config=config, audio=audio)
-            
-            # Извлекаем результат
-            if response.results:
-                transcript = response.results[0].alternatives[0].transcript
-                confidence = response.results[0].alternatives[0].confidence
-                print(f"[STT] Transcript: {transcript} (confidence: {confidence})")
-                return transcript
-            else:
-                return ""
-                
-        except Exception as e:
-            print(f"[STT] Error: {e}")
-            return f"[STT ERROR] {str(e)}"
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=self._recognition_config(),
+            interim_results=True
+        )
+        return GoogleStreamingRecognizer(
+            self.stt_client,
+            streaming_config,
+            speech.StreamingRecognizeRequest
+        )
     
     async def generate_speech(self, text: str) -> bytes:
         """
-        Генерация речи из текста
+        Генерация речи из текста (с кэшем по тексту, голосу и кодировке)
         """
         if not self.tts_client:
             # Заглушка если Google TTS недоступен
             return b"[MOCK TTS] Audio data for: " + text.encode()
         
+        cache_key = self.tts_cache.make_key(text, TTS_VOICE_NAME, TTS_AUDIO_ENCODING)
+        cached = self.tts_cache.get(cache_key)
+        if cached is None and self.tts_cache.disk_dir:
+            # Переход в пул потоков только если дисковый кэш включен
+            cached = await asyncio.get_event_loop().run_in_executor(
+                None, self.tts_cache.load_from_disk, cache_key
+            )
+        if cached is not None:
+            return cached
+        
         try:
             # Настройка синтеза речи
             synthesis_input = texttospeech.SynthesisInput(text=text)
             
             voice = texttospeech.VoiceSelectionParams(
-                language_code="ru-RU",
-                name="ru-RU-Standard-A",
+                language_code=TTS_LANGUAGE_CODE,
+                name=TTS_VOICE_NAME,
                 ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
             )
             
             audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
+                audio_encoding=getattr(texttospeech.AudioEncoding, TTS_AUDIO_ENCODING)
             )
             
             # Генерируем аудио
-            response = self.tts_client.synthesize_speech(
+            response = await self.executor.run(
+                self.tts_client.synthesize_speech,
                 input=synthesis_input, 
                 voice=voice, 
                 audio_config=audio_config
             )
             
             print(f"[TTS] Generated {len(response.audio_content)} bytes for: {text[:50]}...")
+            if self.tts_cache.disk_dir:
+                # Запись на диск блокирующая - выносим в пул потоков
+                await asyncio.get_event_loop().run_in_executor(
+                    None, self.tts_cache.put, cache_key, response.audio_content
+                )
+            else:
+                self.tts_cache.put(cache_key, response.audio_content)
             return response.audio_content
             
+        except asyncio.TimeoutError:
+            print(f"[TTS] Timeout after {self.executor.timeout}s for: {text[:50]}...")
+            return b""
         except Exception as e:
             print(f"[TTS] Error: {e}")
             return b""
+    
+    async def prewarm_tts_cache(self, phrases: List[str]):
+        """Прогрев кэша фиксированными фразами (приветствие, завершение, заглушки вопросов)"""
+        if not self.tts_client:
+            return
+        warmed = 0
+        for phrase in phrases:
+            # Прогреваем те же сегменты, которые запросит инкрементальный синтез
+            async for _, _, _, audio in self.generate_speech_stream(phrase):
+                if audio:
+                    warmed += 1
+        print(f"[TTS] Кэш прогрет: {warmed} сегментов, статистика: {self.tts_cache.get_statistics()}")
+    
+    async def generate_speech_stream(self, text: str, max_concurrency: Optional[int] = None):
+        """
+        Инкрементальный синтез речи: текст режется по предложениям, сегменты синтезируются
+        параллельно (не более max_concurrency одновременно) и отдаются строго по порядку.
+        Отдает кортежи (index, count, segment_text, audio_bytes).
+        """
+        segments = split_into_sentences(text) or [text]
+        semaphore = asyncio.Semaphore(max_concurrency or TTS_SENTENCE_CONCURRENCY)
+        
+        async def synthesize(segment: str) -> bytes:
+            async with semaphore:
+                return await self.generate_speech(segment)
+        
+        tasks = [asyncio.ensure_future(synthesize(segment)) for segment in segments]
+        try:
+            for index, (segment, task) in enumerate(zip(segments, tasks)):
+                yield index, len(segments), segment, await task
+        finally:
+            # Клиент отключился или поток закрыт раньше - отменяем оставшийся синтез
+            for task in tasks:
+                task.cancel()
+
+
+class FakeQuestionProvider:
+    """Локальный провайдер вопросов для тестов и офлайн-разработки: отдает заранее заданный текст по токенам"""
+    
+    def __init__(self, questions: Optional[List[str]] = None, token_delay: float = 0.0):
+        self.questions = questions or ["Расскажите, пожалуйста, о вашем последнем проекте."]
+        self.token_delay = token_delay
+        self.calls = 0
+    
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        question = self.questions[self.calls % len(self.questions)]
+        self.calls += 1
+        # Разбиваем по словам, сохраняя пробелы - как токены у реальных моделей
+        for i, word in enumerate(question.split(" ")):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
 
 
 class MLQuestionGenerator:
     """Класс для генерации вопросов с помощью ML моделей"""
     
-    def __init__(self):
+    FALLBACK_QUESTIONS = [
+        "Расскажите подробнее о вашем опыте работы",
+        "Какие технологии вы используете в своей работе?",
+        "Как вы решаете сложные задачи?",
+        "Расскажите о своих достижениях",
+        "Что вас мотивирует в работе?",
+        "Как вы работаете в команде?",
+        "Какие у вас планы на развитие?",
+        "Почему вас интересует эта позиция?"
+    ]
+    
+    def __init__(self, fake_provider: Optional[FakeQuestionProvider] = None):
         google_api_key = os.getenv("GOOGLE_API_KEY")
         gemini_key = os.getenv("GEMINI_API_KEY")
         openai_key = os.getenv("OPENAI_API_KEY")
@@ -198,6 +315,11 @@ class MLQuestionGenerator:
         if self.google_cloud_available or self.gemini_available:
             # Используем актуальную модель
             self.gemini_model = genai.GenerativeModel('gemini-1.5-pro-latest')
+        
+        # Локальный провайдер: явно переданный или включенный через QUESTION_PROVIDER=fake
+        if fake_provider is None and os.getenv("QUESTION_PROVIDER", "").lower() == "fake":
+            fake_provider = FakeQuestionProvider()
+        self.fake_provider = fake_provider
             
         print(f"[MLQuestionGenerator] Google Cloud API available: {self.google_cloud_available}")
         print(f"[MLQuestionGenerator] Gemini AI Studio available: {self.gemini_available}")
@@ -233,6 +355,45 @@ class MLQuestionGenerator:
         # Заглушка
         return self._generate_fallback_question(transcript, question_number)
     
+    async def generate_question_stream(
+        self,
+        transcript: str,
+        question_number: int,
+        job_description: str = "",
+        previous_questions: list = None
+    ) -> AsyncIterator[str]:
+        """
+        Потоковая генерация вопроса: отдает фрагменты текста по мере поступления токенов.
+        Если провайдер упал до первого токена - пробуем следующий; если после - обрываем
+        поток на уже полученном тексте.
+        """
+        prompt = self._build_prompt(transcript, question_number, job_description, previous_questions or [])
+        
+        providers = []
+        if self.fake_provider:
+            providers.append(("Fake", self.fake_provider.stream))
+        if self.google_cloud_available or self.gemini_available:
+            providers.append(("Gemini", self._stream_with_gemini))
+        if self.openai_available:
+            providers.append(("OpenAI", self._stream_with_openai))
+        
+        for name, stream in providers:
+            emitted = False
+            try:
+                async for delta in stream(prompt):
+                    if delta:
+                        emitted = True
+                        yield delta
+                if emitted:
+                    return
+            except Exception as e:
+                print(f"[{name}] Streaming error: {e}")
+                if emitted:
+                    return
+        
+        # Заглушка отдается одним фрагментом
+        yield self._generate_fallback_question(transcript, question_number)
+    
     def _build_prompt(self, transcript: str, question_number: int, job_description: str, previous_questions: list) -> str:
         """Построение промпта для ML модели"""
         
@@ -270,6 +431,51 @@ class MLQuestionGenerator:
             print(f"[Gemini] Generation error: {e}")
             raise
     
+    async def _stream_with_gemini(self, prompt: str) -> AsyncIterator[str]:
+        """Потоковая генерация с помощью Gemini: итерация по чанкам идет в потоке executor"""
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        def produce():
+            try:
+                for chunk in self.gemini_model.generate_content(prompt, stream=True):
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+        
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            await producer
+    
+    async def _stream_with_openai(self, prompt: str) -> AsyncIterator[str]:
+        """Потоковая генерация с помощью OpenAI"""
+        response = await openai.ChatCompletion.acreate(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "Ты опытный HR-специалист"},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=150,
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in response:
+            delta = chunk.choices[0].delta
+            content = delta.get("content") if hasattr(delta, "get") else getattr(delta, "content", None)
+            if content:
+                yield content
+    
     async def _generate_with_openai(self, prompt: str) -> str:
         """Генерация вопроса с помощью OpenAI"""
         try:
@@ -292,16 +498,7 @@ class MLQuestionGenerator:
     def _generate_fallback_question(self, transcript: str, question_number: int) -> str:
         """Заглушка для генерации вопроса"""
         
-        fallback_questions = [
-            "Расскажите подробнее о вашем опыте работы",
-            "Какие технологии вы используете в своей работе?",
-            "Как вы решаете сложные задачи?",
-            "Расскажите о своих достижениях",
-            "Что вас мотивирует в работе?",
-            "Как вы работаете в команде?",
-            "Какие у вас планы на развитие?",
-            "Почему вас интересует эта позиция?"
-        ]
+        fallback_questions = self.FALLBACK_QUESTIONS
         
         # Выбираем вопрос по номеру или случайно
         if question_number <= len(fallback_questions):
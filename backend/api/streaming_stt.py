@@ -0,0 +1,249 @@
+"""
+Потоковое распознавание речи для одного WebSocket соединения:
+- аудио фрагменты складываются в очередь и уходят в один долгоживущий streaming запрос
+- запрос выполняется в отдельном потоке, чтобы не блокировать event loop
+- число одновременных streaming запросов ограничено (StreamLimiter); сверх лимита поток
+  ждет свободный слот, а аудио тем временем копится в его очереди
+- промежуточные и финальные результаты возвращаются в event loop через asyncio.Queue
+- FakeStreamingRecognizer повторяет интерфейс без обращения к Google (для тестов и офлайн-разработки)
+"""
+
+import abc
+import asyncio
+import os
+import queue
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+# Google закрывает streaming запрос примерно через 5 минут - переоткрываем его,
+# переотправляя заголовок контейнера и еще не подтвержденное финальным результатом аудио
+MAX_STREAM_RESTARTS = 20
+# Сколько фрагментов после последнего финального результата хранится для переотправки
+MAX_REPLAY_CHUNKS = 200
+# Одновременных streaming запросов на процесс (каждый держит рабочий поток и gRPC соединение)
+STREAMING_STT_MAX_STREAMS = int(os.getenv("STREAMING_STT_MAX_STREAMS", "32"))
+
+
+class StreamLimiter:
+    """Ограничение одновременных потоков распознавания с метриками ожидания"""
+
+    def __init__(self, max_streams: int = STREAMING_STT_MAX_STREAMS):
+        self.max_streams = max_streams
+        self._slots = threading.BoundedSemaphore(max_streams)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.started = 0
+
+    def acquire(self):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+        self._slots.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.active += 1
+            self.started += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                "max_streams": self.max_streams,
+                "active": self.active,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "started": self.started
+            }
+
+
+stream_limiter = StreamLimiter()
+
+
+class StreamingRecognizer(abc.ABC):
+    """Базовый класс: очередь аудио -> поток распознавания -> asyncio очередь результатов"""
+
+    name = "base"
+
+    def __init__(self, limiter: Optional[StreamLimiter] = None):
+        self.limiter = limiter or stream_limiter
+        self._audio: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.bytes_fed = 0
+
+    def start(self):
+        self._loop = asyncio.get_event_loop()
+        self._thread = threading.Thread(target=self._run, name=f"stt-{self.name}", daemon=True)
+        self._thread.start()
+
+    def feed(self, chunk: bytes):
+        """Добавляет аудио фрагмент в текущий поток распознавания"""
+        if self._closed or not chunk:
+            return
+        self.bytes_fed += len(chunk)
+        self._audio.put(chunk)
+
+    def close(self):
+        """Завершает поток: распознаватель дорабатывает оставшееся аудио и отдает финальные результаты"""
+        if not self._closed:
+            self._closed = True
+            self._audio.put(None)
+
+    async def results(self) -> AsyncIterator[Dict]:
+        """Результаты распознавания: {"text", "is_final", "confidence"}"""
+        while True:
+            item = await self._results.get()
+            if item is None:
+                return
+            yield item
+
+    def _audio_chunks(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._audio.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def _emit(self, text: str, is_final: bool, confidence: Optional[float] = None):
+        self._loop.call_soon_threadsafe(self._results.put_nowait, {
+            "text": text,
+            "is_final": is_final,
+            "confidence": confidence
+        })
+
+    def _run(self):
+        self.limiter.acquire()
+        try:
+            self._recognize()
+        except Exception as e:
+            print(f"[StreamingSTT] Ошибка распознавания ({self.name}): {e}")
+        finally:
+            self.limiter.release()
+            self._loop.call_soon_threadsafe(self._results.put_nowait, None)
+
+    @abc.abstractmethod
+    def _recognize(self):
+        """Читает аудио из очереди и отдает результаты через _emit (выполняется в рабочем потоке)"""
+
+
+class GoogleStreamingRecognizer(StreamingRecognizer):
+    """Распознавание через Google streaming_recognize в рабочем потоке"""
+
+    name = "google"
+
+    def __init__(self, client, streaming_config, request_factory, limiter: Optional[StreamLimiter] = None):
+        super().__init__(limiter)
+        self.client = client
+        self.streaming_config = streaming_config
+        self.request_factory = request_factory
+        # Первый фрагмент WEBM_OPUS несет заголовок контейнера: без него новый поток не декодируется
+        self._header: Optional[bytes] = None
+        # Аудио после последнего финального результата - при перезапуске уходит в новый поток
+        self._unconfirmed: Deque[bytes] = deque(maxlen=MAX_REPLAY_CHUNKS)
+        # Фрагменты, которые успел забрать генератор запросов уже упавшего потока
+        self._stray: List[Optional[bytes]] = []
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _stream_requests(self, generation: int, replay: List[bytes]):
+        """Запросы одного streaming вызова: сначала переотправка, затем новое аудио из очереди"""
+        for chunk in replay:
+            yield self.request_factory(audio_content=chunk)
+        while True:
+            chunk = self._audio.get()
+            with self._lock:
+                if generation != self._generation:
+                    # gRPC дочитал генератор после ошибки - фрагмент достанется новому потоку
+                    if chunk is None:
+                        self._audio.put(None)
+                    else:
+                        self._stray.append(chunk)
+                    return
+                pending, self._stray = self._stray + [chunk], []
+            for item in pending:
+                if item is None:
+                    # Признак конца остается в очереди: поток после перезапуска тоже завершится
+                    self._audio.put(None)
+                    return
+                self._remember(item)
+                yield self.request_factory(audio_content=item)
+
+    def _remember(self, chunk: bytes):
+        with self._lock:
+            if self._header is None:
+                self._header = chunk
+            else:
+                self._unconfirmed.append(chunk)
+
+    def _replay_chunks(self) -> List[bytes]:
+        with self._lock:
+            self._generation += 1
+            if self._header is None:
+                return []
+            return [self._header, *self._unconfirmed]
+
+    def _recognize(self):
+        restarts = 0
+        replay: List[bytes] = []
+        while True:
+            requests = self._stream_requests(self._generation, replay)
+            try:
+                responses = self.client.streaming_recognize(config=self.streaming_config, requests=requests)
+                for response in responses:
+                    for result in response.results:
+                        if not result.alternatives:
+                            continue
+                        alternative = result.alternatives[0]
+                        if result.is_final:
+                            with self._lock:
+                                self._unconfirmed.clear()
+                        self._emit(alternative.transcript, result.is_final, alternative.confidence or None)
+                return
+            except Exception as e:
+                # Превышен лимит длительности потока - открываем новый, если клиент еще говорит
+                # или осталось аудио без финального результата
+                if restarts >= MAX_STREAM_RESTARTS or (self._closed and not self._unconfirmed):
+                    raise
+                restarts += 1
+                replay = self._replay_chunks()
+                print(f"[StreamingSTT] Перезапуск потока распознавания ({restarts}), "
+                      f"переотправка {len(replay)} фрагментов: {e}")
+
+
+class FakeStreamingRecognizer(StreamingRecognizer):
+    """
+    Локальный распознаватель: на каждый фрагмент отдает промежуточный результат,
+    при закрытии - финальный. Без заданного transcript ведет себя как прежний MOCK STT.
+    """
+
+    name = "fake"
+
+    def __init__(self, transcript: Optional[str] = None, limiter: Optional[StreamLimiter] = None):
+        super().__init__(limiter)
+        self.transcript = transcript
+
+    def _recognize(self):
+        words = self.transcript.split() if self.transcript else []
+        received = 0
+        chunks = 0
+        for chunk in self._audio_chunks():
+            received += len(chunk)
+            chunks += 1
+            self._emit(self._text(words, received, chunks), is_final=False)
+        if chunks:
+            self._emit(self._text(words, received, len(words) or chunks), is_final=True, confidence=1.0)
+
+    @staticmethod
+    def _text(words, received: int, chunks: int) -> str:
+        if not words:
+            return f"[MOCK STT] Обработано {received} байт аудио"
+        return " ".join(words[:chunks])
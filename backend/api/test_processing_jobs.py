@@ -0,0 +1,70 @@
+"""
+Тестовый скрипт для проверки фоновых заданий обработки интервью
+"""
+
+import asyncio
+import sys
+import os
+import threading
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from processing_jobs import ProcessingJobRunner
+
+
+async def _progress_events_from_worker_thread():
+    """События из рабочего потока доставляются подписчику по порядку, submit не ждет выполнения"""
+    runner = ProcessingJobRunner(max_concurrent=1)
+    received = []
+
+    async def work(job):
+        def blocking_scoring():
+            for index in range(3):
+                job.report("skill_scored", index=index)
+            assert threading.current_thread() is not threading.main_thread()
+        await asyncio.get_event_loop().run_in_executor(None, blocking_scoring)
+        return {"success": True}
+
+    async def listener(event):
+        received.append(event["stage"])
+
+    job = runner.submit("session-1", work)
+    assert job.status == "queued"
+    job.subscribe(listener)
+    result = await job.wait()
+    await asyncio.sleep(0)
+
+    assert result == {"success": True}
+    assert job.status == "completed"
+    assert received == ["started", "skill_scored", "skill_scored", "skill_scored", "completed"]
+    assert runner.find_by_session("session-1") is job
+    print(f"✅ События: {received}")
+
+
+async def _error_is_reported():
+    runner = ProcessingJobRunner()
+
+    async def work(job):
+        raise RuntimeError("scoring failed")
+
+    job = runner.submit("session-2", work)
+    assert await job.wait() is None
+    assert job.status == "error" and job.error == "scoring failed"
+    assert job.to_dict()["events"][-1]["stage"] == "error"
+    print("✅ Ошибка задания сохранена в статусе")
+
+
+def test_progress_events_from_worker_thread():
+    asyncio.run(_progress_events_from_worker_thread())
+
+
+def test_error_is_reported():
+    asyncio.run(_error_is_reported())
+
+
+if __name__ == "__main__":
+    print("🚀 Запуск тестов фоновых заданий обработки")
+    test_progress_events_from_worker_thread()
+    test_error_is_reported()
+    print("\n🎯 Все тесты выполнены успешно!")
@@ -0,0 +1,80 @@
+"""
+Тестовый скрипт для проверки потоковой генерации вопросов (question_partial)
+на локальном FakeQuestionProvider без обращения к Gemini/OpenAI
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from speech_service import MLQuestionGenerator, FakeQuestionProvider
+
+
+async def _stream_yields_partials():
+    """Поток отдает фрагменты, склейка которых равна вопросу"""
+    provider = FakeQuestionProvider(["Как вы организуете код-ревью в команде?"])
+    generator = MLQuestionGenerator(fake_provider=provider)
+
+    parts = []
+    async for delta in generator.generate_question_stream("Я бэкенд разработчик", 1):
+        parts.append(delta)
+
+    assert len(parts) > 1, "Ожидалось несколько фрагментов"
+    assert "".join(parts) == "Как вы организуете код-ревью в команде?"
+    print(f"✅ Получено фрагментов: {len(parts)}")
+
+
+async def _first_token_latency():
+    """Первый фрагмент приходит раньше, чем весь вопрос целиком"""
+    provider = FakeQuestionProvider(["Раз два три четыре пять шесть семь восемь"], token_delay=0.05)
+    generator = MLQuestionGenerator(fake_provider=provider)
+
+    start = time.perf_counter()
+    first_token_at = None
+    async for _ in generator.generate_question_stream("ответ", 1):
+        if first_token_at is None:
+            first_token_at = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    assert first_token_at < total / 2
+    print(f"✅ Первый фрагмент: {first_token_at * 1000:.0f}ms, весь вопрос: {total * 1000:.0f}ms")
+
+
+async def _fallback_when_provider_fails():
+    """Если провайдер упал до первого токена - отдается заглушка"""
+
+    class BrokenProvider(FakeQuestionProvider):
+        async def stream(self, prompt):
+            raise RuntimeError("provider down")
+            yield ""
+
+    generator = MLQuestionGenerator(fake_provider=BrokenProvider())
+    generator.google_cloud_available = generator.gemini_available = generator.openai_available = False
+
+    parts = [delta async for delta in generator.generate_question_stream("ответ", 1)]
+    assert parts == [generator._generate_fallback_question("ответ", 1)]
+    print("✅ Заглушка отдана одним фрагментом")
+
+
+def test_stream_yields_partials():
+    asyncio.run(_stream_yields_partials())
+
+
+def test_first_token_latency():
+    asyncio.run(_first_token_latency())
+
+
+def test_fallback_when_provider_fails():
+    asyncio.run(_fallback_when_provider_fails())
+
+
+if __name__ == "__main__":
+    print("🚀 Запуск тестов потоковой генерации вопросов")
+    test_stream_yields_partials()
+    test_first_token_latency()
+    test_fallback_when_provider_fails()
+    print("\n🎯 Все тесты выполнены успешно!")
@@ -0,0 +1,82 @@
+"""
+Тестовый скрипт для проверки очереди разбора резюме при загрузке
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_ingestion import ResumeIngestionBusy, ResumeIngestionQueue, ingest_resume_file, load_analysis
+
+MOCK_CV = Path(__file__).parent.parent.parent / "mocks" / "ds2" / "cv" / "uglov_vladislav_cv (7).pdf"
+
+
+async def _statuses_and_backpressure():
+    """Файлы проходят queued -> processing -> completed, при заполненной очереди новые отклоняются"""
+    release = threading.Event()
+
+    def fake_ingest(file_path):
+        release.wait(timeout=5)
+        if file_path.endswith("broken.pdf"):
+            raise ValueError("не PDF")
+        return {"telegram": "candidate", "cached": False}
+
+    queue = ResumeIngestionQueue(max_workers=1, max_queue=2, ingest=fake_ingest, executor=ThreadPoolExecutor(1))
+    first = queue.submit("a.pdf", "/tmp/a.pdf")
+    second = queue.submit("broken.pdf", "/tmp/broken.pdf")
+    assert first.status == "queued" and queue.pending == 2
+    try:
+        queue.submit("c.pdf", "/tmp/c.pdf")
+        assert False, "ожидался отказ при заполненной очереди"
+    except ResumeIngestionBusy:
+        pass
+    assert queue.rejected == 1 and queue.get("c.pdf") is None
+
+    await asyncio.sleep(0.05)
+    assert first.status == "processing" and second.status == "queued"
+    release.set()
+    await asyncio.wait_for(second.done.wait(), timeout=5)
+
+    assert first.to_dict()["status"] == "completed"
+    assert first.to_dict()["summary"]["telegram"] == "candidate"
+    assert first.to_dict()["analysis_url"] == "/api/hr/file/a.pdf/analysis"
+    assert second.status == "error" and second.error == "не PDF"
+    await asyncio.sleep(0)
+    assert queue.pending == 0 and queue.has_capacity(2)
+    print(f"✅ Статусы и отказ при переполнении: {queue.get_statistics()}")
+
+
+def test_statuses_and_backpressure():
+    asyncio.run(_statuses_and_backpressure())
+
+
+def test_ingest_saves_analysis_next_to_file():
+    """Результат разбора сохраняется рядом с файлом, неизмененный файл повторно не разбирается"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "resume.pdf")
+        shutil.copy(MOCK_CV, file_path)
+
+        summary = ingest_resume_file(file_path)
+        assert summary["cached"] is False
+        assert summary["telegram"] == "ncbx666"
+        record = load_analysis(file_path)
+        assert record["filename"] == "resume.pdf" and record["pages"] == summary["pages"]
+        assert record["resume_info"]["total_experience_years"] == summary["total_experience_years"]
+
+        assert ingest_resume_file(file_path)["cached"] is True
+    print(f"✅ Разбор сохранен рядом с файлом: {summary}")
+
+
+if __name__ == "__main__":
+    print("🚀 Запуск тестов очереди разбора резюме")
+    test_statuses_and_backpressure()
+    test_ingest_saves_analysis_next_to_file()
+    print("\n🎯 Все тесты выполнены успешно!")
@@ -0,0 +1,161 @@
+"""
+Тестовый скрипт для проверки потокового распознавания речи
+на локальном FakeStreamingRecognizer без обращения к Google STT
+"""
+
+import asyncio
+import sys
+import os
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from types import SimpleNamespace
+
+from streaming_stt import FakeStreamingRecognizer, GoogleStreamingRecognizer, StreamLimiter
+
+
+async def collect(recognizer):
+    return [result async for result in recognizer.results()]
+
+
+async def _interim_and_final_results():
+    """На каждый фрагмент - промежуточный результат, при закрытии - финальный"""
+    recognizer = FakeStreamingRecognizer("Я пишу на Python пять лет")
+    recognizer.start()
+    consumer = asyncio.create_task(collect(recognizer))
+
+    for _ in range(3):
+        recognizer.feed(b"\x00" * 320)
+    recognizer.close()
+    results = await consumer
+
+    interim = [r for r in results if not r["is_final"]]
+    final = [r for r in results if r["is_final"]]
+    assert [r["text"] for r in interim] == ["Я", "Я пишу", "Я пишу на"]
+    assert len(final) == 1 and final[0]["text"] == "Я пишу на Python пять лет"
+    assert recognizer.bytes_fed == 960
+    print(f"✅ Промежуточных: {len(interim)}, финальный: {final[0]['text']}")
+
+
+async def _event_loop_not_blocked():
+    """Распознавание идет в отдельном потоке: event loop продолжает обслуживать задачи"""
+    recognizer = FakeStreamingRecognizer()
+    recognizer.start()
+    consumer = asyncio.create_task(collect(recognizer))
+
+    ticks = 0
+    for _ in range(10):
+        recognizer.feed(b"\x00" * 1024)
+        await asyncio.sleep(0)
+        ticks += 1
+    recognizer.close()
+    results = await consumer
+
+    assert ticks == 10
+    assert results[-1]["is_final"]
+    assert results[-1]["text"].startswith("[MOCK STT]")
+    print(f"✅ Получено результатов: {len(results)}")
+
+
+async def _feed_after_close_is_ignored():
+    recognizer = FakeStreamingRecognizer("тест")
+    recognizer.start()
+    recognizer.close()
+    recognizer.feed(b"\x00")
+    results = await collect(recognizer)
+    assert results == []
+    print("✅ Фрагменты после закрытия игнорируются")
+
+
+class FlakyStreamingClient:
+    """Имитация Google streaming_recognize: первый поток обрывается после трех запросов"""
+
+    def __init__(self):
+        self.streams = []
+
+    def streaming_recognize(self, config, requests):
+        received = []
+        self.streams.append(received)
+        for request in requests:
+            received.append(request["audio_content"])
+            if len(self.streams) == 1 and len(received) == 3:
+                raise RuntimeError("Exceeded maximum allowed stream duration")
+        alternative = SimpleNamespace(transcript="ответ", confidence=0.9)
+        return [SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative], is_final=True)])]
+
+
+async def _restart_resends_header_and_unconfirmed_audio():
+    """После обрыва новый поток получает заголовок WEBM и аудио без финального результата"""
+    client = FlakyStreamingClient()
+    recognizer = GoogleStreamingRecognizer(client, streaming_config=None, request_factory=dict)
+    recognizer.start()
+    consumer = asyncio.create_task(collect(recognizer))
+
+    for chunk in (b"header", b"a", b"b", b"c"):
+        recognizer.feed(chunk)
+    recognizer.close()
+    results = await consumer
+
+    assert client.streams[0] == [b"header", b"a", b"b"]
+    assert client.streams[1] == [b"header", b"a", b"b", b"c"]
+    assert [r["text"] for r in results] == ["ответ"]
+    print(f"✅ После перезапуска отправлено: {client.streams[1]}")
+
+
+async def _streams_over_limit_wait_for_slot():
+    """Сверх лимита поток распознавания ждет свободный слот, его аудио не теряется"""
+    limiter = StreamLimiter(max_streams=1)
+    first = FakeStreamingRecognizer("первый ответ", limiter=limiter)
+    second = FakeStreamingRecognizer("второй ответ", limiter=limiter)
+    first.start()
+    await asyncio.sleep(0.05)
+    second.start()
+    first_results = asyncio.create_task(collect(first))
+    second_results = asyncio.create_task(collect(second))
+
+    second.feed(b"\x00" * 320)
+    second.close()
+    await asyncio.sleep(0.05)
+    assert not second_results.done()
+    assert limiter.get_statistics()["active"] == 1 and limiter.get_statistics()["waiting"] == 1
+
+    first.feed(b"\x00" * 320)
+    first.close()
+    await first_results
+    results = await asyncio.wait_for(second_results, timeout=5)
+    assert results[-1]["text"] == "второй ответ"
+    assert limiter.get_statistics()["started"] == 2 and limiter.get_statistics()["active"] == 0
+    print(f"✅ Ограничение потоков: {limiter.get_statistics()}")
+
+
+def test_interim_and_final_results():
+    asyncio.run(_interim_and_final_results())
+
+
+def test_event_loop_not_blocked():
+    asyncio.run(_event_loop_not_blocked())
+
+
+def test_feed_after_close_is_ignored():
+    asyncio.run(_feed_after_close_is_ignored())
+
+
+
+def test_restart_resends_header_and_unconfirmed_audio():
+    asyncio.run(_restart_resends_header_and_unconfirmed_audio())
+
+
+
+def test_streams_over_limit_wait_for_slot():
+    asyncio.run(_streams_over_limit_wait_for_slot())
+
+
+if __name__ == "__main__":
+    print("🚀 Запуск тестов потокового распознавания")
+    test_interim_and_final_results()
+    test_event_loop_not_blocked()
+    test_feed_after_close_is_ignored()
+    test_restart_resends_header_and_unconfirmed_audio()
+    test_streams_over_limit_wait_for_slot()
+    print("\n🎯 Все тесты выполнены успешно!")
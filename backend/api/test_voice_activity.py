@@ -0,0 +1,72 @@
+"""
+Тестовый скрипт для проверки VAD и накопления аудио перед STT
+"""
+
+import struct
+import sys
+import os
+
+# Добавляем путь к API модулям
+sys.path.insert(0, os.path.dirname(__file__))
+
+from voice_activity import VoiceActivityBuffer
+
+SPEECH_OPUS = 1000
+SILENCE_OPUS = 150
+
+
+def feed(buffer, chunks):
+    batches = []
+    for chunk in chunks:
+        batches += buffer.push(chunk)
+    return batches + buffer.flush()
+
+
+def test_opus_batches_speech_and_drops_trailing_silence():
+    """Речь склеивается в пакеты, хвостовая тишина не уходит в STT"""
+    buffer = VoiceActivityBuffer(encoding="WEBM_OPUS", max_batch_seconds=60)
+    sizes = [1500] + [SILENCE_OPUS] * 5 + [SPEECH_OPUS] * 20 + [SILENCE_OPUS] * 30
+    batches = feed(buffer, [bytes(n) for n in sizes])
+
+    stats = buffer.get_statistics()
+    assert stats["stt_requests"] == 1
+    assert stats["chunks_dropped"] == 28
+    # Заголовок и тишина перед речью сохраняются - поток контейнера остается непрерывным
+    assert len(batches[0]) == 1500 + 5 * SILENCE_OPUS + 20 * SPEECH_OPUS + 2 * SILENCE_OPUS
+    print(f"✅ Opus: {stats['chunks_in']} фрагментов -> {stats['stt_requests']} запрос(ов) к STT")
+
+
+def test_opus_answer_without_speech_is_not_sent():
+    buffer = VoiceActivityBuffer(encoding="WEBM_OPUS")
+    batches = feed(buffer, [bytes(1500)] + [bytes(SILENCE_OPUS)] * 30)
+    assert batches == []
+    assert buffer.get_statistics()["chunks_dropped"] == 31
+    print("✅ Ответ без речи не отправляется в STT")
+
+
+def test_pcm_drops_all_silence():
+    """LINEAR16: тишина отбрасывается и перед речью, и между сегментами"""
+    loud = struct.pack("<160h", *([3000, -3000] * 80))
+    quiet = bytes(320)
+    buffer = VoiceActivityBuffer(encoding="LINEAR16", max_batch_seconds=60)
+    batches = feed(buffer, [quiet] * 10 + [loud] * 20 + [quiet] * 10 + [loud] * 5 + [quiet] * 20)
+
+    assert [len(b) for b in batches] == [(20 + 2) * 320, (5 + 2) * 320]
+    print(f"✅ PCM: пакеты {[len(b) for b in batches]} байт")
+
+
+def test_size_threshold_splits_batches():
+    buffer = VoiceActivityBuffer(encoding="WEBM_OPUS", max_batch_bytes=4000, max_batch_seconds=60)
+    batches = feed(buffer, [bytes(1500)] + [bytes(SPEECH_OPUS)] * 10)
+    assert len(batches) == 3
+    assert all(len(b) >= 4000 for b in batches[:-1])
+    print(f"✅ Порог по размеру: {len(batches)} пакета")
+
+
+if __name__ == "__main__":
+    print("🚀 Запуск тестов VAD")
+    test_opus_batches_speech_and_drops_trailing_silence()
+    test_opus_answer_without_speech_is_not_sent()
+    test_pcm_drops_all_silence()
+    test_size_threshold_splits_batches()
+    print("\n🎯 Все тесты выполнены успешно!")
@@ -0,0 +1,120 @@
+"""
+Кэш синтезированной речи (TTS):
+- ключ - хэш от (текст, голос, кодировка)
+- в памяти LRU, ограниченный по суммарному размеру аудио в байтах
+- опциональный дисковый уровень в uploads/tts_cache (переживает перезапуск сервера)
+- счетчики попаданий/промахов для мониторинга
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TTS_CACHE_DISK_ENABLED = os.getenv("TTS_CACHE_DISK_ENABLED", "True").lower() == "true"
+TTS_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "uploads", "tts_cache")
+)
+
+
+class TTSCache:
+    """LRU кэш аудио по содержимому запроса с дисковым уровнем"""
+
+    def __init__(self, max_bytes: int = TTS_CACHE_MAX_BYTES, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, voice: str, encoding: str) -> str:
+        payload = "\x1f".join([voice, encoding, text]).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.audio")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Поиск в памяти (без обращения к диску - безопасно вызывать из event loop)"""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return audio
+
+    def load_from_disk(self, key: str) -> Optional[bytes]:
+        """Поиск на диске с подъемом записи в память; промах засчитывается здесь"""
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    audio = f.read()
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, audio)
+                return audio
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[TTSCache] Ошибка чтения с диска: {e}")
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, audio: bytes, persist: bool = True):
+        """Сохраняет аудио в память и (если включено) на диск"""
+        if not audio:
+            return
+        self._remember(key, audio)
+        if persist and self.disk_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"[TTSCache] Ошибка записи на диск: {e}")
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= len(previous)
+            self._entries[key] = audio
+            self._size_bytes += len(audio)
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "disk_enabled": bool(self.disk_dir)
+            }
+
+
+tts_cache = TTSCache(disk_dir=TTS_CACHE_DIR if TTS_CACHE_DISK_ENABLED else None)
@@ -0,0 +1,158 @@
+"""
+Детектор речевой активности (VAD) и накопитель аудио перед STT:
+- тишина не отправляется в распознавание
+- фрагменты речи склеиваются в пакеты и уходят в распознаватель, когда
+  сегмент речи закончился или превышен порог по размеру/времени
+- для несжатого LINEAR16 активность считается по энергии (RMS),
+  для сжатого Opus - по размеру фрагмента относительно недавнего пика
+  (VBR кодек кодирует тишину заметно меньшим числом байт)
+
+Контейнерный поток (WEBM_OPUS) нельзя резать посередине: тишина внутри ответа
+придерживается и отправляется, только если речь продолжилась. Отбрасывается
+тишина в конце ответа и ответы без речи целиком. Для LINEAR16 тишина
+отбрасывается всегда.
+"""
+
+import array
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+VAD_MAX_BATCH_BYTES = int(os.getenv("VAD_MAX_BATCH_BYTES", str(64 * 1024)))
+VAD_MAX_BATCH_SECONDS = float(os.getenv("VAD_MAX_BATCH_SECONDS", "1.0"))
+# Сколько тихих фрагментов подряд считаются паузой внутри речи, а не концом сегмента
+VAD_HANGOVER_CHUNKS = int(os.getenv("VAD_HANGOVER_CHUNKS", "2"))
+VAD_PCM_RMS_THRESHOLD = float(os.getenv("VAD_PCM_RMS_THRESHOLD", "500"))
+VAD_OPUS_SILENCE_RATIO = float(os.getenv("VAD_OPUS_SILENCE_RATIO", "0.35"))
+
+
+class VoiceActivityBuffer:
+    """Накопитель аудио одного ответа: push() возвращает пакеты, готовые для распознавания"""
+
+    def __init__(
+        self,
+        encoding: str = "WEBM_OPUS",
+        max_batch_bytes: int = VAD_MAX_BATCH_BYTES,
+        max_batch_seconds: float = VAD_MAX_BATCH_SECONDS,
+        hangover_chunks: int = VAD_HANGOVER_CHUNKS
+    ):
+        self.encoding = encoding
+        self.is_pcm = encoding == "LINEAR16"
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_seconds = max_batch_seconds
+        self.hangover_chunks = hangover_chunks
+        self._peak_chunk_bytes = 0.0
+        self.chunks_in = 0
+        self.chunks_dropped = 0
+        self.batches_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.reset()
+
+    def reset(self):
+        """Начало нового ответа (новая запись со своим заголовком контейнера)"""
+        self._batch: List[bytes] = []
+        self._batch_bytes = 0
+        self._batch_started_at: Optional[float] = None
+        # Тишина, придержанная до выяснения, продолжится ли речь
+        self._held: List[bytes] = []
+        self._speaking = False
+        self._silent_run = 0
+        self._seen_speech = False
+        self._answer_chunks = 0
+
+    def is_speech(self, chunk: bytes) -> bool:
+        if self.is_pcm:
+            samples = array.array("h")
+            samples.frombytes(chunk[: len(chunk) - len(chunk) % 2])
+            if not samples:
+                return False
+            rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+            return rms >= VAD_PCM_RMS_THRESHOLD
+        # Opus VBR: пик медленно затухает, чтобы порог подстраивался под громкость и битрейт
+        self._peak_chunk_bytes = max(len(chunk), self._peak_chunk_bytes * 0.98)
+        return len(chunk) >= VAD_OPUS_SILENCE_RATIO * self._peak_chunk_bytes
+
+    def push(self, chunk: bytes) -> List[bytes]:
+        """Принимает фрагмент и возвращает 0 или 1 пакет для распознавателя"""
+        if not chunk:
+            return []
+        self.chunks_in += 1
+        self.bytes_in += len(chunk)
+        self._answer_chunks += 1
+        # Первый фрагмент записи несет заголовок контейнера - без него поток не декодируется
+        is_header = not self.is_pcm and self._answer_chunks == 1
+        if is_header:
+            # Размер первого фрагмента задает начальный уровень для порога тишины
+            self._peak_chunk_bytes = max(self._peak_chunk_bytes, float(len(chunk)))
+
+        if is_header or self.is_speech(chunk):
+            if not self.is_pcm or is_header:
+                # Контейнер: придержанная тишина нужна для непрерывности потока
+                self._append(self._held)
+            else:
+                self.chunks_dropped += len(self._held)
+            self._held = []
+            self._append([chunk])
+            self._speaking = not is_header or self._speaking
+            self._seen_speech = self._seen_speech or not is_header
+            self._silent_run = 0
+        elif self._speaking and self._silent_run < self.hangover_chunks:
+            # Короткая пауза внутри речи - не обрезаем окончания слов
+            self._silent_run += 1
+            self._append([chunk])
+        else:
+            self._held.append(chunk)
+            if self._speaking:
+                # Пауза затянулась - сегмент речи закончен, отправляем накопленное
+                self._speaking = False
+                return self._take_batch()
+            if self.is_pcm:
+                self.chunks_dropped += len(self._held)
+                self._held = []
+
+        if self._batch_bytes >= self.max_batch_bytes or (
+            self._batch_started_at is not None
+            and time.monotonic() - self._batch_started_at >= self.max_batch_seconds
+        ):
+            return self._take_batch()
+        return []
+
+    def flush(self) -> List[bytes]:
+        """Конец ответа: отдает остаток речи, хвостовая тишина отбрасывается"""
+        self.chunks_dropped += len(self._held)
+        self._held = []
+        batches = self._take_batch() if self._seen_speech else []
+        if not self._seen_speech:
+            self.chunks_dropped += len(self._batch)
+        self.reset()
+        return batches
+
+    def _append(self, chunks: List[bytes]):
+        for chunk in chunks:
+            if self._batch_started_at is None:
+                self._batch_started_at = time.monotonic()
+            self._batch.append(chunk)
+            self._batch_bytes += len(chunk)
+
+    def _take_batch(self) -> List[bytes]:
+        if not self._batch or not self._seen_speech:
+            return []
+        batch = b"".join(self._batch)
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_started_at = None
+        self.batches_out += 1
+        self.bytes_out += len(batch)
+        return [batch]
+
+    def get_statistics(self) -> Dict:
+        return {
+            "encoding": self.encoding,
+            "chunks_in": self.chunks_in,
+            "chunks_dropped": self.chunks_dropped,
+            "stt_requests": self.batches_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out
+        }
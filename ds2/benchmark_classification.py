@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Микро-бенчмарк классификации ответов: по одному (classify_answer в цикле)
+против пакетной classify_answers на 5, 20 и 100 ответах, с пустым кэшем
+эмбеддингов, и повторная пакетная оценка из кэша.
+
+По умолчанию используется настоящая модель SentenceTransformer. С --fake-model
+подставляется детерминированный кодировщик с фиксированной стоимостью вызова
+encode и стоимостью на текст - для проверки без torch.
+
+Запуск: python ds2/benchmark_classification.py [--fake-model] [--repeats 3]
+"""
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+import create_transcript
+from embedding_cache import embedding_cache
+from embedding_models import DEFAULT_MODEL_NAME, registry
+
+SAMPLE_DIALOGUE = [
+    ("Расскажите о конфликте в команде и как вы его решили.",
+     "Двое разработчиков спорили об архитектуре, я собрал встречу, и мы договорились о компромиссе."),
+    ("Какой у вас опыт работы с SQL?",
+     "Пишу запросы с оконными функциями, оптимизировал индексы в PostgreSQL."),
+    ("Как вы планируете свою работу?",
+     "Разбиваю задачи на этапы, расставляю приоритеты и слежу за сроками."),
+    ("Как вы внедряли модели машинного обучения?",
+     "Развернул модель оттока через REST API и настроил мониторинг качества."),
+]
+
+
+class FakeEncoder:
+    """Имитирует SentenceTransformer.encode: накладные расходы на вызов + время на текст"""
+
+    # Своя метка бэкенда: фиктивные векторы не смешиваются в кэше с настоящими
+    backend = "fake"
+
+    def __init__(self, call_overhead: float = 0.01, per_text: float = 0.002, dim: int = 384):
+        self.call_overhead = call_overhead
+        self.per_text = per_text
+        self.dim = dim
+
+    def encode(self, texts, normalize_embeddings=False):
+        time.sleep(self.call_overhead + self.per_text * len(texts))
+        vectors = []
+        for text in texts:
+            seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+            vectors.append(np.random.default_rng(seed).standard_normal(self.dim))
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def make_dialogue(size: int):
+    pairs = [SAMPLE_DIALOGUE[i % len(SAMPLE_DIALOGUE)] for i in range(size)]
+    # Номер вопроса делает тексты разными
+    return [f"{question} ({i + 1})" for i, (question, _) in enumerate(pairs)], [answer for _, answer in pairs]
+
+
+def best_of(repeats: int, func, cold: bool = True):
+    timings = []
+    for _ in range(repeats):
+        if cold:
+            embedding_cache.clear()
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake-model", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fake_model:
+        fake_encoder = FakeEncoder()
+        registry.register(DEFAULT_MODEL_NAME, fake_encoder)
+        # Кэш эмбеддингов не сохраняется на диск при выходе (EMBEDDING_CACHE_PATH)
+        embedding_cache.path = None
+        # Фиктивные эмбеддинги словаря не должны попасть в кэш на диске
+        create_transcript._soft_embeddings = fake_encoder.encode(create_transcript.soft_skills, normalize_embeddings=True)
+    # Загрузка модели и эмбеддингов словаря не входит в замер
+    create_transcript.get_soft_embeddings()
+
+    print(f"{'ответов':>8} {'по одному, мс':>14} {'пакетом, мс':>12} {'ускорение':>10} {'повтор из кэша, мс':>19}")
+    for size in (5, 20, 100):
+        questions, answers = make_dialogue(size)
+        loop_s, loop_labels = best_of(args.repeats, lambda: [
+            create_transcript.classify_answer(q, a) for q, a in zip(questions, answers)
+        ])
+        batch_s, batch_labels = best_of(args.repeats, lambda: create_transcript.classify_answers(questions, answers))
+        # Повторная оценка того же транскрипта: все эмбеддинги уже в кэше
+        cached_s, cached_labels = best_of(args.repeats, lambda: create_transcript.classify_answers(questions, answers), cold=False)
+        assert loop_labels == batch_labels == cached_labels, "Пакетная классификация расходится с поштучной"
+        print(f"{size:>8} {loop_s * 1000:>14.1f} {batch_s * 1000:>12.1f} {loop_s / batch_s:>9.1f}x {cached_s * 1000:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
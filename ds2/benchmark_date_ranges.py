@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк извлечения диапазонов дат из резюме на синтетическом 50-страничном
+резюме: find_date_ranges отдельно и расчет стажа + отладочных диапазонов так,
+как это делает parse_file.
+
+Синтетический текст собирается из блоков мест работы в тех же форматах дат,
+что встречаются в моковых резюме ("янв 2018 — апр 2020", "01.2018 - 04.2020",
+"с 2018 по настоящее время", "2010\\n—\\n2018", "3 года 9 месяцев").
+
+Запуск: python ds2/benchmark_date_ranges.py [--pages 50] [--repeats 5]
+"""
+
+import argparse
+import time
+from typing import List
+
+import pdf_parser
+
+MONTH_NAMES = ["январь", "фев", "марта", "апр", "май", "июнь", "июл", "августа", "сент", "октябрь", "ноя", "декабря"]
+LINES_PER_PAGE = 45
+
+
+def job_block(i: int) -> List[str]:
+    start_year = 1990 + i % 30
+    end_year = start_year + 1 + i % 4
+    month_a = MONTH_NAMES[i % 12]
+    month_b = MONTH_NAMES[(i * 5) % 12]
+    date_lines = [
+        f"{month_a} {start_year} — {month_b} {end_year}",
+        f"{(i % 12) + 1:02d}.{start_year} - {((i * 7) % 12) + 1:02d}.{end_year}",
+        f"с {start_year} по настоящее время",
+        f"{start_year}\n—\n{end_year}",
+        f"{month_a} {start_year} — настоящее время",
+    ]
+    return [
+        f"ООО \"Компания {i}\", Москва",
+        date_lines[i % len(date_lines)],
+        f"{1 + i % 5} года {i % 12} месяцев",
+        "Ведущий аналитик",
+        "- Разработка требований к информационным системам и согласование их с заказчиком",
+        "- Анализ бизнес-процессов, подготовка отчетности и презентаций для руководства",
+        "- Проводил интервью с пользователями, составлял пользовательские истории",
+        "- Администрирование серверов, настройка резервного копирования и мониторинга",
+        "Участвовал во внедрении CRM-системы в 12 филиалах компании за 2019 год.",
+        "",
+    ]
+
+
+def synthetic_resume(pages: int = 50) -> str:
+    lines = ["Иванов Иван Иванович", "Опыт работы — 25 лет 3 месяца", "Опыт работы"]
+    i = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.extend(job_block(i))
+        i += 1
+    lines += ["Навыки", "SQL, Python, BPMN, UML", "Образование", "2005 МГУ"]
+    return "\n".join(lines)
+
+
+def timed(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    text = synthetic_resume(args.pages)
+    ranges = pdf_parser.find_date_ranges(text)
+    print(f"Текст: {args.pages} стр., {len(text)} символов, диапазонов: {len(ranges)}")
+
+    def experience_and_debug():
+        pdf_parser.parse_month_year_token.cache_clear()
+        # Расчет стажа без явной строки "Опыт работы — N лет" и отладочные диапазоны, как в parse_file
+        body = text.replace("Опыт работы — 25 лет 3 месяца", "")
+        ranges = pdf_parser.find_date_ranges(body)
+        pdf_parser.compute_total_experience_years_from_text(body, ranges)
+
+    def date_ranges():
+        # Каждый прогон - как первый документ в процессе, без разобранных токенов в кэше
+        pdf_parser.parse_month_year_token.cache_clear()
+        pdf_parser.find_date_ranges(text)
+
+    print(f"find_date_ranges:              {timed(date_ranges, args.repeats):8.1f} ms")
+    print(f"стаж + отладочные диапазоны:   {timed(experience_and_debug, args.repeats):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Замер холодного старта ds2: время импорта create_transcript и первой классификации.
+
+Режимы (каждый в отдельном процессе, чтобы импорт был холодным):
+- eager: как было раньше - модель и эмбеддинги словаря загружаются сразу при импорте
+- lazy: импорт без загрузки модели, загрузка при первой классификации
+
+Запуск: python ds2/benchmark_model_startup.py
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+CHILD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import create_transcript
+if sys.argv[2] == "eager":
+    create_transcript.get_soft_embeddings()
+imported = time.perf_counter()
+create_transcript.classify_answer("Как вы решаете конфликты в команде?", "Обсуждаю проблему с коллегами и ищу компромисс")
+first = time.perf_counter()
+create_transcript.classify_answer("Какой у вас опыт с SQL?", "Пишу сложные запросы с оконными функциями")
+second = time.perf_counter()
+print(json.dumps({"import_s": imported - started, "first_classify_s": first - imported, "next_classify_s": second - first}))
+"""
+
+
+def measure(mode: str) -> dict:
+    ds2_path = str(Path(__file__).resolve().parent)
+    result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, ds2_path, mode], capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    print(f"{'режим':<6} {'импорт, с':>10} {'1-я классиф., с':>16} {'след., с':>9}")
+    for mode in ("eager", "lazy"):
+        timings = measure(mode)
+        if "error" in timings:
+            print(f"{mode:<6} ошибка: {timings['error']}")
+            continue
+        print(f"{mode:<6} {timings['import_s']:>10.2f} {timings['first_classify_s']:>16.2f} {timings['next_classify_s']:>9.3f}")
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Сравнение бэкендов извлечения текста PDF на моковых резюме и вакансиях:
+время по бэкендам, доля страниц с откатом на pdfplumber и число документов,
+у которых результат parse_text отличается от эталонного (pdfplumber).
+
+Запуск: python ds2/benchmark_pdf_backends.py [--repeats 3] [--backends pdfplumber auto]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import pdf_parser
+
+MOCKS_DIR = Path(__file__).resolve().parent.parent / "mocks" / "ds2"
+
+
+def run_backend(files, backend: str, repeats: int):
+    """Лучшее время прохода по всем файлам, статистика извлечения и результаты parse_text"""
+    best = float("inf")
+    stats = {}
+    parsed = {}
+    for _ in range(repeats):
+        pdf_parser.extraction_stats.reset()
+        started = time.perf_counter()
+        texts = {path: pdf_parser.extract_text_from_pdf(path, backend) for path in files}
+        elapsed = time.perf_counter() - started
+        if elapsed < best:
+            best = elapsed
+            stats = pdf_parser.extraction_stats.get_statistics()
+    for path, text in texts.items():
+        parsed[path] = pdf_parser.parse_text(text, path)
+    return best, stats, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=["pdfplumber", "auto", *pdf_parser.FAST_TEXT_BACKENDS])
+    args = parser.parse_args()
+
+    files = sorted(MOCKS_DIR.rglob("*.pdf"))
+    print(f"Файлов: {len(files)}")
+    reference = None
+    for backend in args.backends:
+        name = pdf_parser.resolve_text_backend(backend)
+        if reference is not None and name == "pdfplumber" and backend != "pdfplumber":
+            continue
+        seconds, stats, parsed = run_backend(files, backend, args.repeats)
+        if reference is None:
+            reference = parsed
+        differ = sum(
+            1 for path in files
+            if parsed[path]["resume_info"] != reference[path]["resume_info"]
+            or parsed[path]["vacancy_info"] != reference[path]["vacancy_info"]
+        )
+        per_backend = ", ".join(
+            f"{b} {stats['pages'][b]} стр. {stats['seconds'][b] * 1000:.0f}ms" for b in stats["pages"]
+        )
+        print(f"{backend:<11} -> {name:<10} всего {seconds * 1000:7.0f}ms | {per_backend} | "
+              f"откат {stats['fallback_pages']} стр. ({stats['fallback_rate']:.0%}) | "
+              f"отличается от pdfplumber: {differ}/{len(files)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 import json
+import threading
 import uuid
 from pathlib import Path
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from embedding_cache import embedding_cache
+from embedding_models import load_or_build_embeddings, registry
 
 # Словарь софт-скиллов
 soft_skills = [
@@ -32,28 +34,68 @@ soft_skills = [
     "project management", "planning", "coordination", "delegation"
 ]
 
-# Загружаем модель эмбеддингов (одна модель понимает и русский, и английский)
-model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
-# Предварительно считаем эмбеддинги для словаря
-soft_embeddings = model.encode(soft_skills, normalize_embeddings=True)
+# Модель эмбеддингов (одна модель понимает и русский, и английский) загружается
+# при первой классификации через общий реестр, а не при импорте модуля
+_soft_embeddings = None
+_soft_embeddings_lock = threading.Lock()
+
+
+def get_soft_embeddings():
+    """Эмбеддинги словаря софт-скиллов: с диска (mmap), пересчет только при смене словаря или модели"""
+    global _soft_embeddings
+    if _soft_embeddings is None:
+        with _soft_embeddings_lock:
+            if _soft_embeddings is None:
+                _soft_embeddings = load_or_build_embeddings(soft_skills, prefix="soft_skills")
+    return _soft_embeddings
+
+
+def prewarm(background: bool = True):
+    """Заранее загружает модель и эмбеддинги словаря (по умолчанию в фоновом потоке)"""
+    if background:
+        return registry.prewarm_in_background(on_loaded=lambda model: get_soft_embeddings())
+    get_soft_embeddings()
+
+
+def classify_texts(texts, threshold=0.5):
+    """
+    Пакетная классификация: тексты, которых нет в кэше эмбеддингов, кодируются
+    одним вызовом encode, все сравниваются со словарем одним матричным умножением.
+    Возвращает список (label, ближайший софт-скилл или None, сходство).
+    """
+    if not texts:
+        return []
+    text_embs = embedding_cache.encode(texts)
+    # Эмбеддинги нормализованы - косинусное сходство равно скалярному произведению
+    sims = text_embs @ get_soft_embeddings().T
+    max_sims = np.max(sims, axis=1)
+    argmax_sims = np.argmax(sims, axis=1)
+    return [
+        ("soft_skill", soft_skills[index], float(max_sim)) if max_sim >= threshold
+        else ("hard_skill", None, float(max_sim))
+        for max_sim, index in zip(max_sims, argmax_sims)
+    ]
+
 
 def classify_text(text, threshold=0.5):
     """Классифицируем текст как soft/hard skill"""
-    text_emb = model.encode([text], normalize_embeddings=True)
-    sims = cosine_similarity(text_emb, soft_embeddings)[0]
-    max_sim = np.max(sims)
-    if max_sim >= threshold:
-        return "soft_skill", soft_skills[np.argmax(sims)], float(max_sim)
-    else:
-        return "hard_skill", None, float(max_sim)
+    return classify_texts([text], threshold)[0]
+
+def format_dialogue_text(question: str, answer: str) -> str:
+    return f"Вопрос: {question}\nОтвет: {answer}"
 
 # ---------------------------
 # Основная функция для проекта
 def classify_answer(question: str, answer: str) -> str:
-    text = f"Вопрос: {question}\nОтвет: {answer}"
-    label, _, _ = classify_text(text)
+    label, _, _ = classify_text(format_dialogue_text(question, answer))
     return label
 
+
+def classify_answers(questions, answers, threshold=0.5):
+    """Категории (soft_skill/hard_skill) для всех пар вопрос-ответ интервью за один проход модели"""
+    texts = [format_dialogue_text(question, answer) for question, answer in zip(questions, answers)]
+    return [label for label, _, _ in classify_texts(texts, threshold)]
+
 # ---------------------------
 # Функция сохранения транскрипта
 # ---------------------------
@@ -105,7 +147,6 @@ if __name__ == "__main__":
     # Собираем все вопросы и ответы в списки
     questions = []
     answers = []
-    texts = []
     for i in range(1, 100):
         q_key = "question" if i == 1 else f"question_{i}"
         a_key = "answer" if i == 1 else f"answer_{i}"
@@ -114,22 +155,11 @@ if __name__ == "__main__":
             answer = data[a_key]
             questions.append(question)
             answers.append(answer)
-            texts.append(f"Вопрос: {question}\nОтвет: {answer}")
         else:
             break
 
     # Пакетное получение эмбеддингов и классификация
-    if texts:
-        text_embs = model.encode(texts, normalize_embeddings=True)
-        sims = cosine_similarity(text_embs, soft_embeddings)
-        max_sims = np.max(sims, axis=1)
-        argmax_sims = np.argmax(sims, axis=1)
-        assessment_categories = [
-            "soft_skill" if max_sim >= 0.5 else "hard_skill"
-            for max_sim in max_sims
-        ]
-    else:
-        assessment_categories = []
+    assessment_categories = classify_answers(questions, answers)
 
     dialogue_parts = []
     for question, answer, assessment_category in zip(questions, answers, assessment_categories):
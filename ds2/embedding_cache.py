@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Кэш эмбеддингов текстов ответов перед model.encode:
+- ключ - хэш от (модель@бэкенд, нормализованный текст); нормализация - Unicode NFC
+  и схлопывание пробелов, регистр сохраняется (модель к нему чувствительна)
+- LRU в памяти, ограниченный по суммарному размеру векторов в байтах
+- счетчики попаданий/промахов для мониторинга
+- опциональное сохранение на диск (.npz) и загрузка при старте
+- encode() кодирует одним вызовом только тексты, которых нет в кэше
+"""
+
+import atexit
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from embedding_models import DEFAULT_MODEL_NAME, get_model, model_id_for, registry
+
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Путь к файлу .npz для сохранения кэша между запусками (пусто - только память)
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """LRU кэш векторов по содержимому текста"""
+
+    def __init__(self, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES, path: Optional[str] = EMBEDDING_CACHE_PATH or None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        payload = "\x1f".join([model_id, normalize_text(text)]).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        # Копия: строка пакета не должна удерживать в памяти весь пакет
+        vector = np.array(vector, dtype=np.float32)
+        size = vector.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.nbytes
+            self._entries[key] = vector
+            self._size_bytes += size
+            # Вытесняем самые давно использованные записи
+            while self._size_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def encode(self, texts: List[str], model_name: str = DEFAULT_MODEL_NAME) -> np.ndarray:
+        """Нормализованные эмбеддинги текстов; модель вызывается один раз и только для промахов"""
+        texts = list(texts)
+        model = get_model(model_name) if registry.is_loaded(model_name) else None
+        model_id = model_id_for(model_name, model)
+        keys = [self.make_key(model_id, text) for text in texts]
+        vectors = [self.get(key) for key in keys]
+        if model is None and any(vector is None for vector in vectors):
+            model = get_model(model_name)
+            # Бэкенд выбран до загрузки; если ONNX не загрузился, ключи должны указывать на torch
+            loaded_id = model_id_for(model_name, model)
+            if loaded_id != model_id:
+                keys = [self.make_key(loaded_id, text) for text in texts]
+                vectors = [self.get(key) for key in keys]
+
+        # Повторы внутри одного пакета кодируются один раз
+        missing = OrderedDict()
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+        if missing:
+            encoded = model.encode(list(missing.values()), normalize_embeddings=True)
+            fresh = dict(zip(missing.keys(), np.asarray(encoded, dtype=np.float32)))
+            for key, vector in fresh.items():
+                self.put(key, vector)
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def save(self, path: Optional[str] = None):
+        """Сохраняет кэш в .npz (атомарно, через временный файл)"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            keys = list(self._entries.keys())
+            matrix = np.vstack(list(self._entries.values())) if keys else np.zeros((0, 0), dtype=np.float32)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, keys=np.array(keys), vectors=matrix)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with np.load(path) as data:
+                for key, vector in zip(data["keys"], data["vectors"]):
+                    self.put(str(key), vector)
+            print(f"[EmbeddingCache] Загружено {len(self._entries)} эмбеддингов из {path}")
+        except Exception as e:
+            print(f"[EmbeddingCache] Не удалось загрузить кэш {path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / requests, 3) if requests else 0.0,
+                "path": self.path
+            }
+
+
+embedding_cache = EmbeddingCache()
+if embedding_cache.path:
+    atexit.register(embedding_cache.save)
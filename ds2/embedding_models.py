@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Общий реестр моделей эмбеддингов SentenceTransformer.
+При EMBEDDING_BACKEND=onnx используется int8 ONNX экспорт (onnx_encoder.py),
+если он есть; иначе - PyTorch.
+
+Модель загружается при первом обращении, а не при импорте модуля, и одна
+копия используется всеми импортерами (create_transcript, backend).
+Загрузка потокобезопасна: параллельные первые запросы ждут одну загрузку.
+prewarm_in_background() позволяет загрузить модель заранее, когда сервер
+уже принимает запросы.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "paraphrase-multilingual-MiniLM-L12-v2")
+# torch (SentenceTransformer) или onnx (int8 экспорт из onnx_encoder.py, с откатом на torch)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# Каталог для предрассчитанных матриц эмбеддингов (словари навыков)
+EMBEDDINGS_DIR = Path(os.getenv("EMBEDDINGS_DIR", str(Path(__file__).resolve().parent / "models" / "embeddings")))
+
+
+class ModelRegistry:
+    """Ленивая потокобезопасная загрузка моделей по имени"""
+
+    def __init__(self):
+        self._models = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+        # Время загрузки каждой модели (сек) - для метрик холодного старта
+        self.load_seconds = {}
+        self._onnx_failed = False
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._registry_lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str = DEFAULT_MODEL_NAME):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock_for(name):
+            # Модель могла загрузиться, пока мы ждали блокировку
+            model = self._models.get(name)
+            if model is None:
+                started = time.perf_counter()
+                model = self._load(name)
+                self.load_seconds[name] = time.perf_counter() - started
+                print(f"[EmbeddingModels] Модель {name} ({getattr(model, 'backend', 'torch')}) загружена за {self.load_seconds[name]:.2f}s")
+                self._models[name] = model
+        return model
+
+    def _load(self, name: str):
+        if self.backend_for(name) == "onnx-int8":
+            try:
+                from onnx_encoder import ONNXSentenceEncoder
+                return ONNXSentenceEncoder(name)
+            except Exception as e:
+                print(f"[EmbeddingModels] ONNX бэкенд недоступен, используем PyTorch: {e}")
+                self._onnx_failed = True
+        # Импорт sentence_transformers (torch) тоже дорогой - делаем его только здесь
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+
+    def backend_for(self, name: str = DEFAULT_MODEL_NAME) -> str:
+        """Бэкенд, которым кодируется модель: от него зависят эмбеддинги и версия матриц на диске"""
+        model = self._models.get(name)
+        if model is not None:
+            return getattr(model, "backend", "torch")
+        if EMBEDDING_BACKEND != "onnx" or self._onnx_failed:
+            return "torch"
+        try:
+            from onnx_encoder import is_exported
+            return "onnx-int8" if is_exported(name) else "torch"
+        except ImportError:
+            return "torch"
+
+    def register(self, name: str, model):
+        """Подставляет уже созданную модель (например, облегченную для бенчмарков)"""
+        with self._lock_for(name):
+            self._models[name] = model
+
+    def is_loaded(self, name: str = DEFAULT_MODEL_NAME) -> bool:
+        return name in self._models
+
+    def prewarm_in_background(self, name: str = DEFAULT_MODEL_NAME, on_loaded=None) -> threading.Thread:
+        """Загружает модель в фоновом потоке; on_loaded(model) вызывается после загрузки"""
+
+        def load():
+            try:
+                model = self.get(name)
+                if on_loaded:
+                    on_loaded(model)
+            except Exception as e:
+                print(f"[EmbeddingModels] Ошибка прогрева модели {name}: {e}")
+
+        thread = threading.Thread(target=load, name=f"prewarm-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def get_statistics(self) -> dict:
+        return {
+            "loaded": {name: getattr(model, "backend", "torch") for name, model in self._models.items()},
+            "load_seconds": {name: round(seconds, 3) for name, seconds in self.load_seconds.items()}
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_model(name: str = DEFAULT_MODEL_NAME):
+    return registry.get(name)
+
+
+def model_id_for(name: str = DEFAULT_MODEL_NAME, model=None) -> str:
+    """
+    Идентификатор "модель@бэкенд" для ключей кэшей. Для загруженной модели бэкенд берется
+    у нее самой: если ONNX не загрузился, векторы считает torch и метка должна это отражать.
+    """
+    if model is None:
+        return f"{name}@{registry.backend_for(name)}"
+    return f"{name}@{getattr(model, 'backend', 'torch')}"
+
+
+def vocabulary_hash(texts) -> str:
+    return hashlib.sha256(json.dumps(list(texts), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _matrix_path(directory: Path, prefix: str, model_id: str, vocab_hash: str) -> Path:
+    version = hashlib.sha256(f"{model_id}\x00{vocab_hash}".encode("utf-8")).hexdigest()[:16]
+    return Path(directory) / f"{prefix}_{version}.npy"
+
+
+def _read_matrix(matrix_path: Path, model_id: str, vocab_hash: str, size: int):
+    """Сохраненная матрица, если она построена той же моделью для того же словаря, иначе None"""
+    meta_path = matrix_path.with_suffix(".json")
+    if not (matrix_path.exists() and meta_path.exists()):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if meta.get("model") == model_id and meta.get("vocabulary_hash") == vocab_hash and matrix.shape[0] == size:
+            return matrix
+        print(f"[EmbeddingModels] {matrix_path.name} не соответствует словарю, пересобираем")
+    except Exception as e:
+        print(f"[EmbeddingModels] Не удалось прочитать {matrix_path.name}, пересобираем: {e}")
+    return None
+
+
+def load_or_build_embeddings(texts, prefix: str, model_name: str = DEFAULT_MODEL_NAME, directory: Path = EMBEDDINGS_DIR):
+    """
+    Нормализованная float32 матрица эмбеддингов словаря, сохраненная на диск.
+
+    Файл версионируется хэшем (модель, словарь): <prefix>_<версия>.npy и
+    метаданные <prefix>_<версия>.json. Матрица открывается через
+    np.load(mmap_mode="r"), поэтому несколько рабочих процессов делят одни
+    страницы памяти, а модель для словаря вообще не загружается. При смене
+    словаря или модели файл пересобирается, старые версии удаляются.
+    """
+    texts = list(texts)
+    vocab_hash = vocabulary_hash(texts)
+    # int8 модель дает немного другие векторы - версия зависит и от бэкенда
+    model_id = model_id_for(model_name)
+    matrix_path = _matrix_path(directory, prefix, model_id, vocab_hash)
+    matrix = _read_matrix(matrix_path, model_id, vocab_hash, len(texts))
+    if matrix is not None:
+        return matrix
+
+    model = get_model(model_name)
+    # Бэкенд выбран до загрузки; если ONNX не загрузился, сохраняем под меткой torch
+    loaded_id = model_id_for(model_name, model)
+    if loaded_id != model_id:
+        model_id = loaded_id
+        matrix_path = _matrix_path(directory, prefix, model_id, vocab_hash)
+        matrix = _read_matrix(matrix_path, model_id, vocab_hash, len(texts))
+        if matrix is not None:
+            return matrix
+    meta_path = matrix_path.with_suffix(".json")
+
+    matrix = np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+    try:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        # Запись через временный файл: другой процесс не прочитает недописанную матрицу
+        tmp_path = matrix_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, matrix_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": model_id,
+                "vocabulary_hash": vocab_hash,
+                "size": len(texts),
+                "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+                "dtype": "float32",
+                "normalized": True,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }, f, ensure_ascii=False, indent=2)
+        for stale in Path(directory).glob(f"{prefix}_*.npy"):
+            if stale != matrix_path:
+                stale.unlink(missing_ok=True)
+                stale.with_suffix(".json").unlink(missing_ok=True)
+        print(f"[EmbeddingModels] Матрица {matrix_path.name} сохранена ({len(texts)} x {matrix.shape[-1]})")
+        return np.load(matrix_path, mmap_mode="r")
+    except Exception as e:
+        print(f"[EmbeddingModels] Не удалось сохранить матрицу эмбеддингов: {e}")
+        return matrix
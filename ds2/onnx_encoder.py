@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+ONNX int8 бэкенд для кодировщика MiniLM (CPU без torch в рантайме).
+
+Экспорт (нужны torch и transformers, выполняется один раз):
+    python ds2/onnx_encoder.py export
+Проверка совпадения меток classify_text с PyTorch моделью:
+    python ds2/onnx_encoder.py parity
+Замер задержки и памяти обоих бэкендов:
+    python ds2/onnx_encoder.py benchmark
+
+Включение в рантайме: EMBEDDING_BACKEND=onnx. Если экспорта нет или
+onnxruntime не установлен, реестр моделей использует PyTorch.
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+ONNX_MODELS_DIR = Path(os.getenv("EMBEDDING_ONNX_DIR", str(Path(__file__).resolve().parent / "models" / "onnx")))
+# Число потоков внутри оператора: на CPU без GPU больше ядер не дает выигрыша на коротких текстах
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", str(min(4, os.cpu_count() or 1))))
+MAX_SEQ_LENGTH = 128
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+
+
+def export_dir_for(model_name: str) -> Path:
+    return ONNX_MODELS_DIR / model_name.replace("/", "__")
+
+
+def is_exported(model_name: str) -> bool:
+    return (export_dir_for(model_name) / QUANTIZED_MODEL_FILE).exists()
+
+
+def _hub_id(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class ONNXSentenceEncoder:
+    """Совместим с SentenceTransformer.encode: mean pooling по маске внимания + нормализация"""
+
+    backend = "onnx-int8"
+
+    def __init__(self, model_name: str, intra_op_threads: int = EMBEDDING_ONNX_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = export_dir_for(model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_dir / QUANTIZED_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = False):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=MAX_SEQ_LENGTH, return_tensors="np"
+            )
+            feeds = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+            hidden = self.session.run(None, feeds)[0]
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(embeddings.astype(np.float32))
+        embeddings = np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def export_int8(model_name: str) -> Path:
+    """Экспорт трансформера в ONNX и динамическая int8 квантизация весов"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    model_dir = export_dir_for(model_name)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(_hub_id(model_name))
+    model = AutoModel.from_pretrained(_hub_id(model_name)).eval()
+    tokenizer.save_pretrained(str(model_dir))
+
+    sample = tokenizer(["Пример текста для экспорта"], return_tensors="pt")
+    fp32_path = model_dir / "model_fp32.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (sample["input_ids"], sample["attention_mask"]), str(fp32_path),
+            input_names=["input_ids", "attention_mask"], output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"}
+            },
+            opset_version=14
+        )
+    quantize_dynamic(str(fp32_path), str(model_dir / QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+    with open(model_dir / "export.json", "w", encoding="utf-8") as f:
+        json.dump({"model": model_name, "quantization": "dynamic int8", "max_seq_length": MAX_SEQ_LENGTH,
+                   "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, ensure_ascii=False, indent=2)
+    print(f"ONNX int8 модель сохранена в {model_dir}")
+    return model_dir
+
+
+def _parity_texts():
+    """Пары вопрос-ответ из моков ds2 и бенчмарка классификации"""
+    from benchmark_classification import SAMPLE_DIALOGUE
+    from create_transcript import format_dialogue_text
+
+    texts = [format_dialogue_text(question, answer) for question, answer in SAMPLE_DIALOGUE]
+    mock_path = Path(__file__).resolve().parent.parent / "mocks" / "ds2" / "input_for_transcript.json"
+    if mock_path.exists():
+        with open(mock_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for i in range(1, 100):
+            q_key = "question" if i == 1 else f"question_{i}"
+            a_key = "answer" if i == 1 else f"answer_{i}"
+            if q_key not in data or a_key not in data:
+                break
+            texts.append(format_dialogue_text(data[q_key], data[a_key]))
+    return texts
+
+
+def _classify_with(encoder, texts, threshold=0.5):
+    from create_transcript import soft_skills
+
+    vocabulary = encoder.encode(soft_skills, normalize_embeddings=True)
+    sims = encoder.encode(texts, normalize_embeddings=True) @ vocabulary.T
+    labels = ["soft_skill" if row.max() >= threshold else "hard_skill" for row in sims]
+    return labels, sims.max(axis=1)
+
+
+def check_parity(model_name: str) -> bool:
+    from sentence_transformers import SentenceTransformer
+
+    texts = _parity_texts()
+    torch_labels, torch_sims = _classify_with(SentenceTransformer(model_name), texts)
+    onnx_labels, onnx_sims = _classify_with(ONNXSentenceEncoder(model_name), texts)
+    mismatches = [i for i, (a, b) in enumerate(zip(torch_labels, onnx_labels)) if a != b]
+    print(f"Текстов: {len(texts)}, совпадение меток: {len(texts) - len(mismatches)}/{len(texts)}, "
+          f"макс. расхождение сходства: {np.max(np.abs(torch_sims - onnx_sims)):.4f}")
+    for i in mismatches:
+        print(f"  расхождение: torch={torch_labels[i]} ({torch_sims[i]:.3f}) "
+              f"onnx={onnx_labels[i]} ({onnx_sims[i]:.3f}) :: {texts[i][:80]}")
+    return not mismatches
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def benchmark(model_name: str, backend: str, repeats: int = 20):
+    texts = _parity_texts()
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    if backend == "onnx":
+        encoder = ONNXSentenceEncoder(model_name)
+    else:
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(model_name)
+    load_s = time.perf_counter() - started
+    encoder.encode(texts[:1])
+
+    single = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        encoder.encode(texts[:1], normalize_embeddings=True)
+        single.append((time.perf_counter() - started) * 1000)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        encoder.encode(texts, normalize_embeddings=True)
+    batch_ms = (time.perf_counter() - started) * 1000 / repeats
+    print(f"{backend:<6} загрузка {load_s:.2f}s, 1 текст p50 {sorted(single)[len(single) // 2]:.1f}ms, "
+          f"пакет из {len(texts)} {batch_ms:.1f}ms, RSS +{_rss_mb() - rss_before:.0f}MB")
+
+
+if __name__ == "__main__":
+    from embedding_models import DEFAULT_MODEL_NAME
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "parity", "benchmark"])
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--backend", choices=["torch", "onnx"], help="для benchmark: один бэкенд (каждый лучше мерить в отдельном процессе)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_int8(args.model)
+    elif args.command == "parity":
+        raise SystemExit(0 if check_parity(args.model) else 1)
+    else:
+        for backend in [args.backend] if args.backend else ["torch", "onnx"]:
+            benchmark(args.model, backend)
@@ -1,5 +1,9 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from functools import lru_cache
 from pathlib import Path
-import re, json, datetime, math
+from typing import Iterator, List, Optional, Tuple
+import argparse, hashlib, importlib.util, itertools, os, re, json, datetime, math, shutil, time
 
 import pdfplumber
 
@@ -7,20 +11,180 @@ import pdfplumber
 VACANCY_DIR = Path("mocks/ds2/vacansy")
 CV_DIR = Path("mocks/ds2/cv")
 OUTPUT_DIR = Path("mocks/ds2")
+# Кэш результатов parse_file для инкрементального режима
+PARSE_CACHE_DIR = OUTPUT_DIR / ".parse_cache"
+# Увеличивать при изменении логики парсинга (таблицы MONTHS/RANGE_PATTERNS/SECTION_HEADINGS учитываются автоматически)
+PARSER_VERSION = "1"
 
-def get_pdf_files(directory: Path) -> list[Path]:
+def get_pdf_files(directory: Path) -> List[Path]:
     """Get all PDF files from directory"""
     return list(directory.glob("*.pdf"))
 
-def extract_text_from_pdf(path: Path) -> str:
-    text = ""
-    with pdfplumber.open(path) as pdf:
-        pages = [ (p.extract_text() or "") for p in pdf.pages ]
-        text = "\n".join(pages)
+# Бэкенд извлечения текста:
+#   pdfplumber - полный посимвольный layout-анализ (медленно, эталонный текст для регулярок)
+#   auto       - быстрый текстовый экстрактор (pymupdf или pypdfium2, что установлено),
+#                страницы, не прошедшие проверку качества, извлекаются pdfplumber
+#   pymupdf / pypdfium2 - конкретный быстрый экстрактор с тем же откатом
+PDF_TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pdfplumber").lower()
+# Проверка качества страницы от быстрого экстрактора
+PDF_TEXT_MIN_CHARS = int(os.getenv("PDF_TEXT_MIN_CHARS", "20"))
+PDF_TEXT_MIN_CYRILLIC_RATIO = float(os.getenv("PDF_TEXT_MIN_CYRILLIC_RATIO", "0.3"))
+# Средняя длина строки больше этой - экстрактор потерял переносы, построчные регулярки не сработают
+PDF_TEXT_MAX_AVG_LINE_CHARS = int(os.getenv("PDF_TEXT_MAX_AVG_LINE_CHARS", "300"))
+
+_TRAILING_SPACES_RE = re.compile(r'[ \t]+(?=\r?\n|$)')
+_CYRILLIC_RE = re.compile(r'[а-яё]', flags=re.IGNORECASE)
+
+def _normalize_text(text: str) -> str:
     text = re.sub(r'\r\n?', '\n', text)
     text = re.sub(r'\n{3,}', '\n\n', text)
     return text
 
+def _pdfplumber_pages(path: Path) -> Iterator[str]:
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text() or ""
+            # Объекты разобранной страницы больше не нужны - не держим их до конца документа
+            page.flush_cache()
+            yield text
+
+def _pymupdf_pages(path: Path) -> Iterator[str]:
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    with pymupdf.open(path) as doc:
+        for page in doc:
+            yield _TRAILING_SPACES_RE.sub('', page.get_text("text", sort=True))
+
+def _pypdfium2_pages(path: Path) -> Iterator[str]:
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(str(path))
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_bounded()
+            finally:
+                textpage.close()
+                page.close()
+            yield _TRAILING_SPACES_RE.sub('', text)
+    finally:
+        pdf.close()
+
+# Быстрые экстракторы в порядке предпочтения для auto: (модуль для проверки установки, функция)
+FAST_TEXT_BACKENDS = {
+    "pymupdf": (("pymupdf", "fitz"), _pymupdf_pages),
+    "pypdfium2": (("pypdfium2",), _pypdfium2_pages)
+}
+
+@lru_cache(maxsize=None)
+def resolve_text_backend(backend: Optional[str] = None) -> str:
+    """Имя реально используемого бэкенда: быстрый экстрактор, если он установлен, иначе pdfplumber"""
+    backend = (backend or PDF_TEXT_BACKEND).lower()
+    if backend == "pdfplumber":
+        return backend
+    candidates = list(FAST_TEXT_BACKENDS) if backend == "auto" else [backend]
+    for name in candidates:
+        modules, _ = FAST_TEXT_BACKENDS.get(name, ((), None))
+        if any(importlib.util.find_spec(module) for module in modules):
+            return name
+    print(f"[pdf_parser] Быстрый экстрактор '{backend}' недоступен, используется pdfplumber")
+    return "pdfplumber"
+
+def is_good_page_text(text: str) -> bool:
+    """Эвристика качества текста страницы: не пустой, в основном кириллица, переносы строк сохранены"""
+    stripped = text.strip()
+    if len(stripped) < PDF_TEXT_MIN_CHARS:
+        return False
+    letters = sum(1 for ch in stripped if ch.isalpha())
+    if not letters or len(_CYRILLIC_RE.findall(stripped)) / letters < PDF_TEXT_MIN_CYRILLIC_RATIO:
+        return False
+    lines = sum(1 for line in stripped.splitlines() if line.strip())
+    return len(stripped) / lines <= PDF_TEXT_MAX_AVG_LINE_CHARS
+
+class ExtractionStats:
+    """Время и число страниц по бэкендам извлечения и доля откатов на pdfplumber (в пределах процесса)"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.pages = {}
+        self.seconds = {}
+        self.fallback_pages = 0
+
+    def record(self, backend: str, seconds: float, fallback: bool = False):
+        self.pages[backend] = self.pages.get(backend, 0) + 1
+        self.seconds[backend] = self.seconds.get(backend, 0.0) + seconds
+        if fallback:
+            self.fallback_pages += 1
+
+    def get_statistics(self) -> dict:
+        # Доля откатов считается от страниц, прочитанных быстрым экстрактором
+        fast_pages = sum(n for name, n in self.pages.items() if name != "pdfplumber")
+        return {
+            "pages": dict(self.pages),
+            "seconds": {name: round(seconds, 3) for name, seconds in self.seconds.items()},
+            "fallback_pages": self.fallback_pages,
+            "fallback_rate": round(self.fallback_pages / fast_pages, 3) if fast_pages else 0.0
+        }
+
+extraction_stats = ExtractionStats()
+
+def iter_pdf_pages(path: Path, normalize: bool = True, backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Лениво отдает текст страниц PDF по одной.
+    Следующая страница разбирается только когда ее запросили: если потребитель
+    нашел ответ и прекратил итерацию, остальные страницы не читаются, а файл
+    закрывается (для явного закрытия - contextlib.closing).
+    backend - см. PDF_TEXT_BACKEND; страницы быстрого экстрактора, не прошедшие
+    is_good_page_text, извлекаются заново pdfplumber (файл открывается им только при первом откате).
+    """
+    name = resolve_text_backend(backend)
+    source = _pdfplumber_pages(path) if name == "pdfplumber" else FAST_TEXT_BACKENDS[name][1](path)
+    fallback_pdf = None
+    try:
+        with closing(source):
+            for page_no in itertools.count():
+                started = time.perf_counter()
+                text = next(source, None)
+                if text is None:
+                    break
+                extraction_stats.record(name, time.perf_counter() - started)
+                if name != "pdfplumber" and not is_good_page_text(text):
+                    started = time.perf_counter()
+                    if fallback_pdf is None:
+                        fallback_pdf = pdfplumber.open(path)
+                    page = fallback_pdf.pages[page_no]
+                    text = page.extract_text() or ""
+                    page.flush_cache()
+                    extraction_stats.record("pdfplumber", time.perf_counter() - started, fallback=True)
+                yield _normalize_text(text) if normalize else text
+    finally:
+        if fallback_pdf is not None:
+            fallback_pdf.close()
+
+def extract_text_from_pdf(path: Path, backend: Optional[str] = None) -> str:
+    with closing(iter_pdf_pages(path, normalize=False, backend=backend)) as pages:
+        text = "\n".join(pages)
+    return _normalize_text(text)
+
+def find_section_page(path: Path, heading_re: Optional[re.Pattern] = None):
+    """
+    Ищет заголовок раздела (по умолчанию "Опыт работы" и синонимы) постранично.
+    Возвращает (номер страницы с 0, текст страницы от заголовка) или None;
+    страницы после найденной не разбираются.
+    """
+    heading_re = heading_re or HEADING_RE
+    with closing(iter_pdf_pages(path)) as pages:
+        for page_no, page_text in enumerate(pages):
+            m = heading_re.search(page_text)
+            if m:
+                return page_no, page_text[m.start():]
+    return None
+
 # Карта месяцев (русские имена, короткие и полные)
 MONTHS = {
     'янв':1,'январь':1,'января':1,
@@ -43,13 +207,16 @@ CUR_DATE = datetime.date(2025,9,3)  # согласно системной инф
 # Примеры поддерживаемых форматов:
 # "янв 2018 — апр 2020", "январь 2018 - апрель 2020", "01.2018 - 04.2020", "2018 — 2020", "с 2018 по настоящее время", "2018 - настоящее время"
 MONTH_YEAR_RE = r'(?:(\d{1,2})[.\-](\d{4}))'  # 01.2018
-TEXT_MONTH_YEAR_RE = r'((?:' + r'|'.join(re.escape(m) for m in MONTHS.keys()) + r')\s*\d{4})'  # 'янв 2018' etc.
+MONTH_NAMES_RE = r'|'.join(re.escape(m) for m in MONTHS.keys())
+TEXT_MONTH_YEAR_RE = r'((?:' + MONTH_NAMES_RE + r')\s*\d{4})'  # 'янв 2018' etc.
 YEAR_ONLY_RE = r'(\d{4})'
 RANGE_SEP = r'[-–—]|to|по|—|–'
-# Собираем несколько вариантов для поиска диапазонов
+# Просмотр вперед по первым буквам месяцев: движок regex не перебирает все названия месяцев в каждой позиции текста
+MONTH_FIRST_LETTERS = ''.join(sorted({m[0] for m in MONTHS.keys()}))
+# Собираем несколько вариантов для поиска диапазонов (компилируются один раз при импорте)
 RANGE_PATTERNS = [
     # textual month-year ranges like 'янв 2018 - апр 2020' (allowing whitespace/newlines)
-    re.compile(rf'({TEXT_MONTH_YEAR_RE})\s*(?:{RANGE_SEP})\s*(настоящее время|по настоящее время|по тн|по н\.в\.|по нв|{TEXT_MONTH_YEAR_RE}|{YEAR_ONLY_RE})', flags=re.IGNORECASE | re.DOTALL),
+    re.compile(rf'(?=[{MONTH_FIRST_LETTERS}])({TEXT_MONTH_YEAR_RE})\s*(?:{RANGE_SEP})\s*(настоящее время|по настоящее время|по тн|по н\.в\.|по нв|{TEXT_MONTH_YEAR_RE}|{YEAR_ONLY_RE})', flags=re.IGNORECASE | re.DOTALL),
     # numeric month.year ranges like '01.2018 - 04.2020'
     re.compile(rf'({MONTH_YEAR_RE})\s*(?:{RANGE_SEP})\s*(настоящее время|по настоящее время|{MONTH_YEAR_RE}|{YEAR_ONLY_RE})', flags=re.IGNORECASE | re.DOTALL),
     # patterns with 'с 2018 по настоящее время' and year ranges; allow newlines between tokens
@@ -58,17 +225,29 @@ RANGE_PATTERNS = [
     # loose pattern: year-year even if on different lines like '2010\n—\n2018'
     re.compile(rf'({YEAR_ONLY_RE})\s*(?:{RANGE_SEP})\s*({YEAR_ONLY_RE}|настоящее время)', flags=re.IGNORECASE | re.DOTALL)
 ]
+# Отдельные даты для сканирования токенов: '01.2018', 'янв 2018', '2018'
+DATE_TOKEN_RE = re.compile(rf'(?=[\d{MONTH_FIRST_LETTERS}])(' + r'|'.join([r'\d{1,2}[.\-]\d{4}'] + [re.escape(k) + r'\s*\d{4}' for k in MONTHS.keys()] + [r'\d{4}']) + r')', flags=re.IGNORECASE)
+# Что должно стоять между двумя соседними датами, чтобы считать их диапазоном
+TOKEN_GAP_RE = re.compile(r'[-–—]|по|до|настоящее|по настоящее', flags=re.IGNORECASE)
+# Длительности вида '3 года 9 месяцев'
+DURATION_RE = re.compile(r'([0-9]{1,2})\s*год(?:а|ов)?(?:\s*([0-9]{1,2})\s*месяц)?', flags=re.IGNORECASE)
+_NUMERIC_MONTH_RE = re.compile(r'(\d{1,2})[.\-](\d{4})')
+_TEXT_MONTH_RE = re.compile(r'(' + MONTH_NAMES_RE + r')\s*(\d{4})')
+_YEAR_RE = re.compile(r'(\d{4})')
+_PRESENT_RE = re.compile(r'настоящее')
 
+# Одни и те же токены ('2018', 'янв 2018') повторяются по всему резюме - разбираем каждый один раз
+@lru_cache(maxsize=4096)
 def parse_month_year_token(token: str):
     token = token.strip().lower()
     # try dd.yyyy or mm.yyyy
-    m = re.match(r'(\d{1,2})[.\-](\d{4})', token)
+    m = _NUMERIC_MONTH_RE.match(token)
     if m:
         mon = int(m.group(1))
         yr = int(m.group(2))
         return datetime.date(yr, mon, 1)
     # try textual month like 'янв 2018' or 'января 2018'
-    m2 = re.search(r'(' + r'|'.join(re.escape(k) for k in MONTHS.keys()) + r')\s*(\d{4})', token)
+    m2 = _TEXT_MONTH_RE.search(token)
     if m2:
         monname = m2.group(1)
         yr = int(m2.group(2))
@@ -80,12 +259,12 @@ def parse_month_year_token(token: str):
         except Exception:
             return None
     # try year only
-    m3 = re.match(r'(\d{4})', token)
+    m3 = _YEAR_RE.match(token)
     if m3:
         yr = int(m3.group(1))
         return datetime.date(yr, 1, 1)
     # special tokens
-    if re.search(r'настоящее', token):
+    if _PRESENT_RE.search(token):
         return CUR_DATE
     return None
 
@@ -94,37 +273,31 @@ def find_date_ranges(text: str):
     # 1) search using the defined patterns (covers many common cases)
     for pat in RANGE_PATTERNS:
         for m in pat.finditer(text):
-            groups = m.groups()
-            tokens = [g for g in groups if g]
+            tokens = [g for g in m.groups() if g]
             if not tokens:
                 continue
-            start_tok = tokens[0]
-            end_tok = tokens[-1]
-            start_dt = parse_month_year_token(start_tok)
-            end_dt = parse_month_year_token(end_tok)
+            start_dt = parse_month_year_token(tokens[0])
+            end_dt = parse_month_year_token(tokens[-1])
             if start_dt and end_dt:
                 ranges.append((start_dt, end_dt))
 
-    # 2) token-scan fallback: find all date-like tokens and pair nearby tokens
-    token_regex = re.compile(r'(' + r'|'.join([r'\d{1,2}[.\-]\d{4}'] + [re.escape(k) + r'\s*\d{4}' for k in MONTHS.keys()] + [r'\d{4}']) + r')', flags=re.IGNORECASE)
-    tokens = []
-    for m in token_regex.finditer(text):
-        tok = m.group(0)
-        dt = parse_month_year_token(tok)
-        if dt:
-            tokens.append((m.start(), m.end(), tok, dt))
-    # pair neighboring tokens if they are close in the text (<=80 chars)
-    for i in range(len(tokens)-1):
-        s0, e0, t0, d0 = tokens[i]
-        s1, e1, t1, d1 = tokens[i+1]
-        if s1 - e0 <= 80:
+    # 2) token-scan fallback: one pass over all date-like tokens, pairing each with the next one
+    prev = None
+    for m in DATE_TOKEN_RE.finditer(text):
+        dt = parse_month_year_token(m.group(0))
+        if not dt:
+            continue
+        s1 = m.start()
+        # pair neighboring tokens if they are close in the text (<=80 chars)
+        if prev is not None and s1 - prev[0] <= 80:
             # ensure a separator like dash or 'по' exists between them or it's reasonable proximity
-            mid = text[e0:s1]
-            if re.search(r'[-–—]|по|до|настоящее|по настоящее', mid, flags=re.IGNORECASE) or len(mid.strip()) < 50:
-                ranges.append((d0, d1))
-        # Also if second token is 'настоящее время' (parsed to CUR_DATE) pair with previous
+            mid = text[prev[0]:s1]
+            if TOKEN_GAP_RE.search(mid) or len(mid.strip()) < 50:
+                ranges.append((prev[1], dt))
+        prev = (m.end(), dt)
+
     # 3) explicit duration phrases like '3 года 9 месяцев' anywhere -> convert to ranges using approximate start
-    for m in re.finditer(r'([0-9]{1,2})\s*год(?:а|ов)?(?:\s*([0-9]{1,2})\s*месяц)?', text, flags=re.IGNORECASE):
+    for m in DURATION_RE.finditer(text):
         yrs = int(m.group(1))
         months = int(m.group(2)) if m.lastindex and m.group(2) else 0
         # represent as a pseudo-range ending at CUR_DATE and starting months ago (approximate)
@@ -140,12 +313,8 @@ def find_date_ranges(text: str):
             start_dt = datetime.date(start_year, start_month, 1)
             ranges.append((start_dt, end_dt))
 
-    # deduplicate ranges
-    uniq = []
-    for r in ranges:
-        if r not in uniq:
-            uniq.append(r)
-    return uniq
+    # deduplicate ranges (keeping first-seen order)
+    return list(dict.fromkeys(ranges))
 
 def months_between(d1: datetime.date, d2: datetime.date):
     return (d2.year - d1.year) * 12 + (d2.month - d1.month) + (1 if d2.day >= d1.day else 0)  # approximate
@@ -254,7 +423,7 @@ def extract_responsibilities_from_experience_section(text: str):
             if re.match(r'^\d{4}\b', s) or re.match(r'^\d{1,2}[\.\-/]\d{4}\b', s):
                 continue
             # textual month + year (e.g., 'янв 2018') -> skip
-            if re.search(r'(' + r'|'.join(re.escape(k) for k in MONTHS.keys()) + r')\s*\d{4}', s, flags=re.IGNORECASE):
+            if re.search(r'(' + MONTH_NAMES_RE + r')\s*\d{4}', s, flags=re.IGNORECASE):
                 continue
             cleaned_lines.append(s)
 
@@ -352,7 +521,8 @@ def extract_responsibilities_from_experience_section(text: str):
         i += 1
     return merged
 
-def compute_total_experience_years_from_text(text: str):
+def compute_total_experience_years_from_text(text: str, ranges=None):
+    # ranges - уже найденные find_date_ranges(text), чтобы не сканировать текст повторно
     # First, prefer an explicit total experience statement like 'Опыт работы — 2 года 4 месяца' or 'Опыт работы — 11 месяцев'
     # Match months-only explicit declaration first
     m_exp_months = re.search(r'Опыт\s+работ[ыи]\s*[:\-–—]?\s*([0-9]{1,2})\s*(?:месяц(?:а|ев)?)', text, flags=re.IGNORECASE)
@@ -365,7 +535,8 @@ def compute_total_experience_years_from_text(text: str):
         months = int(m_exp.group(2)) if m_exp.lastindex and m_exp.group(2) else 0
         return round(yrs + months/12.0, 2), []
 
-    ranges = find_date_ranges(text)
+    if ranges is None:
+        ranges = find_date_ranges(text)
     if not ranges:
         # Fallbacks: look for explicit total-experience phrases anywhere in the text
         # 1) patterns like 'Опыт работы —2 года 4 месяца' or '2 года 4 месяца' or '2 года'
@@ -412,8 +583,11 @@ def compute_total_experience_years_from_text(text: str):
     return total_exp, merged
 
 # Функция парсинга отдельного файла (универсальная: вакансии + резюме)
-def parse_file(path: Path):
-    text = extract_text_from_pdf(path)
+def parse_file(path: Path, text_backend: Optional[str] = None):
+    return parse_text(extract_text_from_pdf(path, text_backend), path)
+
+def parse_text(text: str, path: Path):
+    """Все извлечения parse_file по уже извлеченному тексту PDF"""
     title = path.stem
     # Более гибкий поиск секций
     def extract_section_by_heading_or_keyword(names):
@@ -464,7 +638,8 @@ def parse_file(path: Path):
                 break
 
     # resume-specific extraction
-    total_exp, merged_intervals = compute_total_experience_years_from_text(text)
+    date_ranges = find_date_ranges(text)
+    total_exp, merged_intervals = compute_total_experience_years_from_text(text, date_ranges)
     responsibilities = extract_responsibilities_from_experience_section(text)
     return {
         "filename": path.name,
@@ -479,24 +654,20 @@ def parse_file(path: Path):
             "responsibilities": responsibilities
         },
         "_debug": {
-            "found_date_ranges": [ (s.isoformat(), e.isoformat()) for s,e in find_date_ranges(text) ],
+            "found_date_ranges": [ (s.isoformat(), e.isoformat()) for s,e in date_ranges ],
             "merged_intervals": [ (s.isoformat(), e.isoformat()) for s,e in merged_intervals ]
         }
     }
 
 
 
-# Process all vacancy files
-vacancy_files = get_pdf_files(VACANCY_DIR)
-for vacancy_file in vacancy_files:
-    vacancy_data = parse_file(vacancy_file)
-    
+def build_vacancy_json(vacancy_data: dict) -> dict:
     # Extract vacancy title from filename
     vacancy_filename = vacancy_data["filename"]
     title_match = re.search(r'[Оо]писание\s*(.*)\.pdf', vacancy_filename)
     vacancy_title = title_match.group(1).strip() if title_match else vacancy_filename.replace('.pdf','')
 
-    vacancy_json = {
+    return {
         "filename": vacancy_filename,
         "vacancy_info": {
             "title": vacancy_title,
@@ -506,28 +677,187 @@ for vacancy_file in vacancy_files:
             "responsibilities": vacancy_data["vacancy_info"].get("requirements")
         }
     }
-    
-    # Save each vacancy to a separate JSON file with its name
-    output_file = OUTPUT_DIR / f"parsed_vacancy_{vacancy_title.lower().replace(' ', '_')}.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(vacancy_json, f, ensure_ascii=False, indent=4)
-    print(f"Saved vacancy JSON to: {output_file}")
-
-# Process all resume files
-resume_files = get_pdf_files(CV_DIR)
-for resume_file in resume_files:
-    resume_data = parse_file(resume_file)
-    
+
+def build_resume_json(resume_data: dict) -> dict:
     # Create simplified resume JSON with only required fields
-    resume_json = {
+    return {
         "filename": resume_data["filename"],
         "total_experience_years": resume_data["resume_info"]["total_experience_years"],
         "responsibilities": resume_data["resume_info"]["responsibilities"]
     }
-    
-    # Save each resume to a separate JSON file
-    file_stem = Path(resume_data["filename"]).stem
-    output_file = OUTPUT_DIR / f"parsed_resume_{file_stem.lower().replace(' ', '_')}.json"
+
+def output_path_for(kind: str, parsed_json: dict, output_dir: Path) -> Path:
+    if kind == "vacancy":
+        vacancy_title = parsed_json["vacancy_info"]["title"]
+        return output_dir / f"parsed_vacancy_{vacancy_title.lower().replace(' ', '_')}.json"
+    file_stem = Path(parsed_json["filename"]).stem
+    return output_dir / f"parsed_resume_{file_stem.lower().replace(' ', '_')}.json"
+
+def _table_fingerprint(text_backend: Optional[str] = None) -> str:
+    """Хэш таблиц, шаблонов и бэкенда извлечения текста, от которых зависит результат parse_file"""
+    tables = {
+        "parser_version": PARSER_VERSION,
+        "text_backend": resolve_text_backend(text_backend),
+        "months": MONTHS,
+        "range_patterns": [(pat.pattern, pat.flags) for pat in RANGE_PATTERNS],
+        "section_headings": SECTION_HEADINGS,
+        "cur_date": CUR_DATE.isoformat()
+    }
+    return hashlib.sha256(json.dumps(tables, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def file_content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    Кэш результатов parse_file по хэшу содержимого PDF.
+    Записи лежат в подкаталоге с отпечатком версии парсера и таблиц (MONTHS,
+    RANGE_PATTERNS, SECTION_HEADINGS) и бэкенда извлечения текста: при их изменении
+    кэш не используется.
+    """
+
+    def __init__(self, cache_dir: Path = PARSE_CACHE_DIR, text_backend: Optional[str] = None):
+        self.root = Path(cache_dir)
+        self.fingerprint = _table_fingerprint(text_backend)
+        self.dir = self.root / self.fingerprint
+
+    def _path(self, content_hash: str) -> Path:
+        return self.dir / f"{content_hash}.json"
+
+    def contains(self, content_hash: str) -> bool:
+        return self._path(content_hash).exists()
+
+    def get(self, content_hash: str):
+        try:
+            with open(self._path(content_hash), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, content_hash: str, parsed: dict):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # Запись через временный файл: параллельные процессы не увидят недописанный JSON
+        tmp_path = self._path(content_hash).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(parsed, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(content_hash))
+
+    def prune(self):
+        """Удаляет записи, сделанные прежними версиями парсера"""
+        if not self.root.exists():
+            return
+        for stale in self.root.iterdir():
+            if stale.is_dir() and stale.name != self.fingerprint:
+                shutil.rmtree(stale, ignore_errors=True)
+
+def parse_and_save(kind: str, path: Path, output_dir: Path = OUTPUT_DIR, cache_dir: Optional[Path] = None,
+                   content_hash: Optional[str] = None, text_backend: Optional[str] = None) -> dict:
+    """
+    Парсит один PDF (kind: 'vacancy' или 'resume') и сохраняет JSON; выполняется в рабочем процессе.
+    С cache_dir неизмененный файл не парсится повторно - берется сохраненный результат parse_file.
+    """
+    path = Path(path)
+    cache = ParseCache(cache_dir, text_backend) if cache_dir else None
+    parsed = None
+    if cache:
+        content_hash = content_hash or file_content_hash(path)
+        parsed = cache.get(content_hash)
+    cached = parsed is not None
+    if cached:
+        # Тот же файл мог быть сохранен под другим именем
+        parsed["filename"] = path.name
+        parsed["vacancy_info"]["title"] = path.stem
+    else:
+        parsed = parse_file(path, text_backend)
+        if cache:
+            cache.put(content_hash, parsed)
+    parsed_json = build_vacancy_json(parsed) if kind == "vacancy" else build_resume_json(parsed)
+    output_file = output_path_for(kind, parsed_json, Path(output_dir))
     with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(resume_json, f, ensure_ascii=False, indent=4)
-    print(f"Saved resume JSON to: {output_file}")
+        json.dump(parsed_json, f, ensure_ascii=False, indent=4)
+    return {"kind": kind, "source": str(path), "output_file": str(output_file), "data": parsed_json, "cached": cached}
+
+def collect_jobs(vacancy_dir: Path = VACANCY_DIR, cv_dir: Path = CV_DIR) -> List[Tuple[str, Path]]:
+    jobs = [("vacancy", path) for path in get_pdf_files(vacancy_dir)]
+    jobs += [("resume", path) for path in get_pdf_files(cv_dir)]
+    return jobs
+
+def parse_batch(jobs, output_dir: Path = OUTPUT_DIR, workers: Optional[int] = None, cache_dir: Optional[Path] = None,
+                text_backend: Optional[str] = None):
+    """
+    Парсит пачку PDF в пуле процессов и отдает результаты по мере готовности каждого файла.
+    jobs - список (kind, path). workers=1 - последовательно в текущем процессе.
+    С cache_dir (инкрементальный режим) неизмененные файлы отдаются из кэша сразу,
+    в пул уходят только новые и измененные.
+    Ошибка одного файла не останавливает пачку: результат содержит ключ "error".
+    """
+    pending = []
+    if cache_dir:
+        cache = ParseCache(cache_dir, text_backend)
+        cache.prune()
+        for kind, path in jobs:
+            try:
+                content_hash = file_content_hash(path)
+                if not cache.contains(content_hash):
+                    pending.append((kind, path, content_hash))
+                    continue
+                yield parse_and_save(kind, path, output_dir, cache_dir, content_hash, text_backend)
+            except Exception as e:
+                yield {"kind": kind, "source": str(path), "error": str(e)}
+    else:
+        pending = [(kind, path, None) for kind, path in jobs]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        for kind, path, content_hash in pending:
+            try:
+                yield parse_and_save(kind, path, output_dir, cache_dir, content_hash, text_backend)
+            except Exception as e:
+                yield {"kind": kind, "source": str(path), "error": str(e)}
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = {
+            pool.submit(parse_and_save, kind, path, output_dir, cache_dir, content_hash, text_backend): (kind, path)
+            for kind, path, content_hash in pending
+        }
+        for future in as_completed(futures):
+            kind, path = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"kind": kind, "source": str(path), "error": str(e)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Парсинг PDF вакансий и резюме в parsed_vacancy_*.json / parsed_resume_*.json")
+    parser.add_argument("--vacancy-dir", type=Path, default=VACANCY_DIR)
+    parser.add_argument("--cv-dir", type=Path, default=CV_DIR)
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию - все ядра)")
+    parser.add_argument("--cache-dir", type=Path, default=None, help=f"кэш результатов (по умолчанию <output-dir>/{PARSE_CACHE_DIR.name})")
+    parser.add_argument("--no-cache", action="store_true", help="парсить все файлы заново, без инкрементального кэша")
+    parser.add_argument("--text-backend", choices=["pdfplumber", "auto", *FAST_TEXT_BACKENDS], default=None,
+                        help=f"извлечение текста (по умолчанию PDF_TEXT_BACKEND={PDF_TEXT_BACKEND})")
+    args = parser.parse_args(argv)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir = None if args.no_cache else (args.cache_dir or args.output_dir / PARSE_CACHE_DIR.name)
+    failed = cached = 0
+    started = time.perf_counter()
+    jobs = collect_jobs(args.vacancy_dir, args.cv_dir)
+    for result in parse_batch(jobs, args.output_dir, args.workers, cache_dir, args.text_backend):
+        if "error" in result:
+            failed += 1
+            print(f"Error parsing {result['source']}: {result['error']}")
+        else:
+            cached += result["cached"]
+            print(f"Saved {result['kind']} JSON to: {result['output_file']}" + (" (cached)" if result["cached"] else ""))
+    print(f"Done in {time.perf_counter() - started:.2f}s, from cache: {cached}, errors: {failed}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
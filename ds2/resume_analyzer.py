@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Единая точка анализа PDF резюме: файл открывается и разбирается pdfplumber
+один раз, затем все извлечения (телеграм, диапазоны дат, общий стаж,
+обязанности, разделы вакансии) выполняются над общим текстом.
+
+Запуск: python ds2/resume_analyzer.py путь/к/резюме.pdf
+"""
+
+import argparse
+import json
+from contextlib import closing
+from pathlib import Path
+
+from pdf_parser import _normalize_text, iter_pdf_pages, parse_text
+from telegram_parser import find_telegram_in_pages
+
+
+def analyze_resume(path) -> dict:
+    """
+    Полный анализ резюме за одно открытие PDF.
+
+    Returns:
+        dict: результат parse_file (filename, vacancy_info, resume_info, _debug)
+        плюс "telegram" (аккаунт или None) и "pages" (число страниц)
+    """
+    path = Path(path)
+    with closing(iter_pdf_pages(path, normalize=False)) as pages:
+        page_texts = list(pages)
+    # Тот же текст, что и у extract_text_from_pdf
+    text = _normalize_text("\n".join(page_texts))
+
+    record = parse_text(text, path)
+    record["telegram"] = find_telegram_in_pages(page_texts)
+    record["pages"] = len(page_texts)
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Анализ PDF резюме: стаж, обязанности, телеграм")
+    parser.add_argument("pdf_path", help="Путь к PDF файлу резюме")
+    args = parser.parse_args()
+    print(json.dumps(analyze_resume(args.pdf_path), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,62 @@ import sys
 import json
 import argparse
 import re
+from contextlib import closing
 from pathlib import Path
-import pdfplumber
+from typing import Iterable, Optional
+
+from pdf_parser import iter_pdf_pages
+
+# Паттерны для поиска телеграм аккаунта, в порядке приоритета
+TELEGRAM_PATTERNS = [
+    re.compile(r'telegram[:\s]*@([a-zA-Z0-9_]+)', re.IGNORECASE),
+    re.compile(r'tg[:\s]*@([a-zA-Z0-9_]+)', re.IGNORECASE),
+    re.compile(r'@([a-zA-Z0-9_]+)', re.IGNORECASE),
+    re.compile(r'telegram[:\s]*([a-zA-Z0-9_]{5,32})', re.IGNORECASE),
+    re.compile(r'tg[:\s]*([a-zA-Z0-9_]{5,32})', re.IGNORECASE)
+]
+AT_USERNAME_RE = re.compile(r'@([a-zA-Z0-9_]{5,32})')
+# Хвост предыдущей страницы, который проверяется вместе со следующей (аккаунт мог разорваться на границе страниц)
+PAGE_OVERLAP_CHARS = 64
+
+def find_telegram_in_text(text: str) -> Optional[str]:
+    """Ищет телеграм аккаунт в тексте; None, если не найден"""
+    # Пробуем каждый паттерн
+    for pattern in TELEGRAM_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            username = match.group(1)
+            # Проверяем, что это похоже на телеграм аккаунт (не слишком короткое и не число)
+            if len(username) >= 5 and not username.isdigit():
+                return username
+
+    # Если не нашли по паттернам, ищем просто @username
+    for match in AT_USERNAME_RE.findall(text):
+        if len(match) >= 5 and not match.isdigit():
+            return match
+    return None
+
+def find_telegram_in_pages(pages: Iterable[str]) -> Optional[str]:
+    """Ищет аккаунт постранично и прекращает чтение страниц на первой находке"""
+    tail = ""
+    for page_text in pages:
+        telegram_username = find_telegram_in_text(tail + page_text)
+        if telegram_username:
+            return telegram_username
+        tail = page_text[-PAGE_OVERLAP_CHARS:]
+    return None
 
 def extract_telegram_from_pdf(pdf_path: str) -> dict:
     """
     Извлекает телеграм аккаунт из PDF резюме
-    
+
+    Страницы читаются по одной, чтение останавливается на первой странице,
+    где найден аккаунт (обычно это контакты на первой странице), поэтому
+    длинные PDF не разбираются целиком.
+
     Args:
         pdf_path (str): Путь к PDF файлу резюме
-        
+
     Returns:
         dict: Словарь с телеграм аккаунтом в формате {"telegram": "username"} или {"error": "сообщение"}
     """
@@ -26,49 +72,16 @@ def extract_telegram_from_pdf(pdf_path: str) -> dict:
         # Проверяем существование файла
         if not Path(pdf_path).exists():
             return {"error": f"Файл {pdf_path} не найден"}
-        
-        # Извлекаем текст из PDF
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        
-        # Ищем телеграм аккаунт по различным паттернам
-        # Паттерны для поиска телеграм аккаунта
-        patterns = [
-            r'telegram[:\s]*@([a-zA-Z0-9_]+)',
-            r'tg[:\s]*@([a-zA-Z0-9_]+)',
-            r'@([a-zA-Z0-9_]+)',
-            r'telegram[:\s]*([a-zA-Z0-9_]{5,32})',
-            r'tg[:\s]*([a-zA-Z0-9_]{5,32})'
-        ]
-        
-        telegram_username = None
-        
-        # Пробуем каждый паттерн
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                username = match.group(1)
-                # Проверяем, что это похоже на телеграм аккаунт (не слишком короткое и не число)
-                if len(username) >= 5 and not username.isdigit():
-                    telegram_username = username
-                    break
-        
-        # Если не нашли по паттернам, ищем просто @username
-        if not telegram_username:
-            at_matches = re.findall(r'@([a-zA-Z0-9_]{5,32})', text)
-            for match in at_matches:
-                if len(match) >= 5 and not match.isdigit():
-                    telegram_username = match
-                    break
-        
+
+        with closing(iter_pdf_pages(Path(pdf_path), normalize=False)) as pages:
+            telegram_username = find_telegram_in_pages(pages)
+
         if telegram_username:
             return {"telegram": telegram_username}
         else:
             # Если телеграм не найден, возвращаем пустой словарь
             return {}
-            
+
     except Exception as e:
         return {"error": f"Ошибка при обработке файла: {str(e)}"}
 
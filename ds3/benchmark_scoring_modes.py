@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк режимов скоринга ScoringModelGemini на фикстуре mocks/ds2/transcript_output.json:
+- per_part: части диалога по одной, последовательно (max_concurrency=1)
+- parallel: части по одной, параллельно
+- batched: несколько частей в одном запросе, пакеты параллельно
+
+Вместо Gemini используется фиктивная модель с задержкой на запрос (round trip)
+и на каждую оценку в ответе. Части фикстуры размножаются до --parts, чтобы
+имитировать длинное интервью. Ограничитель частоты работает с настройками
+по умолчанию (SCORING_REQUESTS_PER_MINUTE, SCORING_RATE_BURST), --rpm 0 его отключает.
+
+Запуск: python benchmark_scoring_modes.py [--parts 12] [--latency 0.3] [--concurrency 4] [--rpm 60]
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+from score_candidate import SCORING_RATE_BURST, SCORING_REQUESTS_PER_MINUTE, ScoringModelGemini
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Имитирует generate_content: фиксированная задержка запроса + время генерации каждой оценки"""
+
+    def __init__(self, latency: float, per_item: float, drop_every: int = 0):
+        self.latency = latency
+        self.per_item = per_item
+        self.drop_every = drop_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        with self._lock:
+            self.calls += 1
+        part_ids = [int(part_id) for part_id in re.findall(r'"part_id": (\d+)', prompt)]
+        time.sleep(self.latency + self.per_item * max(1, len(part_ids)))
+
+        if not part_ids:
+            return FakeResponse(json.dumps({"skill_assessed": "skill", "score": 4, "scores": {"relevance": 4},
+                                            "assessment_comment": "Конкретный пример"}, ensure_ascii=False))
+        items = [{"part_id": part_id, "skill_assessed": f"skill_{part_id}", "score": 4,
+                  "assessment_comment": "Конкретный пример"}
+                 for part_id in part_ids
+                 # Имитация частично испорченного ответа: часть оценок пропущена
+                 if not self.drop_every or (part_id + 1) % self.drop_every]
+        return FakeResponse("```json\n" + json.dumps(items, ensure_ascii=False) + "\n```")
+
+
+def load_fixture(parts: int) -> dict:
+    base_path = Path(__file__).resolve().parent.parent
+    with open(base_path / "mocks" / "ds2" / "transcript_output.json", 'r', encoding='utf-8') as f:
+        transcript = json.load(f)
+    template_parts = transcript["dialogue_parts"]
+    transcript["dialogue_parts"] = [
+        {**template_parts[i % len(template_parts)], "skill_assessed": f"skill_{i}",
+         "assessment_category": "hard_skill" if i % 3 else "soft_skill"}
+        for i in range(parts)
+    ]
+    return transcript
+
+
+def load_prompts() -> dict:
+    ds3_path = Path(__file__).resolve().parent
+    return {
+        "scoring": (ds3_path / "scoring_prompt.md").read_text(encoding='utf-8'),
+        "experience": (ds3_path / "experience_prompt.md").read_text(encoding='utf-8'),
+        "batch_scoring": (ds3_path / "batch_scoring_prompt.md").read_text(encoding='utf-8'),
+    }
+
+
+def run_mode(name: str, transcript: dict, args, **scorer_options) -> dict:
+    weights = {"hard_skills": 0.5, "experience": 0.3, "soft_skills": 0.2}
+    scorer = ScoringModelGemini(load_prompts(), weights, requests_per_minute=args.rpm,
+                                rate_burst=args.burst, use_cache=False, **scorer_options)
+    scorer.model = FakeGeminiModel(args.latency, args.per_item, args.drop_every)
+
+    start = time.perf_counter()
+    report = scorer.score(transcript)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": name,
+        "seconds": elapsed,
+        "llm_calls": scorer.model.calls,
+        "final_score_percent": report["final_score_percent"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.3, help="задержка одного запроса, сек")
+    parser.add_argument("--per-item", type=float, default=0.02, help="время генерации одной оценки, сек")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=SCORING_REQUESTS_PER_MINUTE,
+                        help="ограничение запросов в минуту (0 - без ограничения)")
+    parser.add_argument("--burst", type=int, default=SCORING_RATE_BURST, help="запас запросов без ожидания")
+    parser.add_argument("--drop-every", type=int, default=0,
+                        help="пропускать каждую N-ю оценку в пакетном ответе (проверка fallback)")
+    args = parser.parse_args()
+
+    transcript = load_fixture(args.parts)
+    results = [
+        run_mode("per_part", transcript, args, max_concurrency=1),
+        run_mode("parallel", transcript, args, max_concurrency=args.concurrency),
+        run_mode("batched", transcript, args, max_concurrency=args.concurrency, batch_mode=True),
+    ]
+
+    print(f"\n--- {args.parts} частей диалога + опыт, задержка {args.latency * 1000:.0f}ms, "
+          f"лимит {args.rpm:g}/мин, запас {args.burst} ---")
+    print(f"{'режим':<10} {'время, с':>9} {'запросов':>9} {'итог, %':>8}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['seconds']:>9.2f} {result['llm_calls']:>9} {result['final_score_percent']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Постоянный кэш ответов LLM для скоринга (SQLite).
+
+Скоринг идет с temperature=0, поэтому повторная оценка того же транскрипта
+(повторы, /api/hr/score, перезапуск score_candidate.py на моках) может брать
+ответы из кэша. Ключ: (имя модели, generation_config, sha256 промпта).
+Кэшируются только ответы, которые успешно распарсились.
+
+Вытеснение: записи старше TTL удаляются при чтении и при записи,
+при превышении лимита размера удаляются давно не использованные записи.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+SCORING_CACHE_ENABLED = os.getenv("SCORING_CACHE_ENABLED", "true").lower() == "true"
+SCORING_CACHE_PATH = os.getenv(
+    "SCORING_CACHE_PATH", str(Path(__file__).resolve().parent / "cache" / "llm_responses.sqlite3")
+)
+SCORING_CACHE_TTL_SECONDS = int(os.getenv("SCORING_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+SCORING_CACHE_MAX_BYTES = int(os.getenv("SCORING_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+class LLMResponseCache:
+    """Потокобезопасный кэш текстов ответов модели в SQLite"""
+
+    def __init__(self, path: str = SCORING_CACHE_PATH, ttl_seconds: int = SCORING_CACHE_TTL_SECONDS,
+                 max_bytes: int = SCORING_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, generation_config: Dict, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        config = json.dumps(generation_config, sort_keys=True)
+        return hashlib.sha256(f"{model_name}\x00{config}\x00{prompt_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model_name: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, size, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        expired = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.evictions += expired.rowcount
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Вытесняем давно не использованные записи, пока не уложимся в лимит
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        requests = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / requests, 3) if requests else 0.0
+        }
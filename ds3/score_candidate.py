@@ -1,8 +1,13 @@
 import os
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import google.generativeai as genai
 
+from llm_response_cache import LLMResponseCache, SCORING_CACHE_ENABLED
+
 try:
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
     genai.configure(api_key=GOOGLE_API_KEY)
@@ -10,46 +15,229 @@ except (TypeError, ValueError) as e:
     print(f"ОШИБКА: API-ключ не найден или некорректен. Убедитесь, что вы создали переменную окружения GOOGLE_API_KEY. Ошибка: {e}")
     exit()
 
+# Ограничения для параллельной оценки частей диалога
+SCORING_MAX_CONCURRENCY = int(os.getenv('SCORING_MAX_CONCURRENCY', '4'))
+# Не больше N запросов к Gemini в минуту в среднем (0 - без ограничения)
+SCORING_REQUESTS_PER_MINUTE = float(os.getenv('SCORING_REQUESTS_PER_MINUTE', '60'))
+# Сколько запросов можно отправить сразу, без ожидания (не меньше max_concurrency):
+# оценка одного интервью обычно укладывается в запас и не ждет ограничителя
+SCORING_RATE_BURST = int(os.getenv('SCORING_RATE_BURST', '16'))
+# Пакетный режим: несколько частей диалога в одном запросе (нужен prompts["batch_scoring"])
+SCORING_BATCH_MODE = os.getenv('SCORING_BATCH_MODE', 'false').lower() == 'true'
+# Пакет собирается, пока суммарная длина вопросов и ответов не превысит порог
+SCORING_BATCH_MAX_CHARS = int(os.getenv('SCORING_BATCH_MAX_CHARS', '6000'))
+SCORING_BATCH_MAX_PARTS = int(os.getenv('SCORING_BATCH_MAX_PARTS', '8'))
+# Не читать кэш ответов (свежие ответы все равно записываются в кэш)
+SCORING_CACHE_BYPASS = os.getenv('SCORING_CACHE_BYPASS', 'false').lower() == 'true'
+
+
+class RateLimiter:
+    """
+    Потокобезопасный token bucket: до burst запросов отправляются сразу,
+    дальше запас пополняется со скоростью requests_per_minute
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.rate = requests_per_minute / 60.0 if requests_per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Токен резервируется сразу: при отрицательном запасе ждем, пока он восполнится
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
 class ScoringModelGemini:
-    def __init__(self, prompts: dict, weights: dict):
+    def __init__(self, prompts: dict, weights: dict, max_concurrency: int = SCORING_MAX_CONCURRENCY,
+                 requests_per_minute: float = SCORING_REQUESTS_PER_MINUTE, rate_burst: int = SCORING_RATE_BURST,
+                 batch_mode: bool = SCORING_BATCH_MODE,
+                 batch_max_chars: int = SCORING_BATCH_MAX_CHARS, batch_max_parts: int = SCORING_BATCH_MAX_PARTS,
+                 use_cache: bool = SCORING_CACHE_ENABLED, response_cache: LLMResponseCache = None,
+                 bypass_cache: bool = SCORING_CACHE_BYPASS):
         if not prompts.get("scoring") or not prompts.get("experience"):
             raise ValueError("Словарь prompts должен содержать ключи 'scoring' и 'experience'")
         self.prompts = prompts
         self.weights = weights
+        self.max_concurrency = max(1, max_concurrency)
+        # Запас не меньше числа параллельных запросов, иначе ограничитель сериализует их
+        self.rate_limiter = RateLimiter(requests_per_minute, burst=max(rate_burst, self.max_concurrency))
+        self.batch_mode = batch_mode and bool(prompts.get("batch_scoring"))
+        if batch_mode and not self.batch_mode:
+            print("-> Пакетный режим недоступен: нет шаблона prompts['batch_scoring'], оценка по одной части")
+        self.batch_max_chars = batch_max_chars
+        self.batch_max_parts = max(1, batch_max_parts)
+        self.model_name = 'gemini-1.5-pro-latest'
+        self.generation_config = {"temperature": 0, "top_p": 0.1}
         self.model = genai.GenerativeModel(
-            'gemini-1.5-pro-latest',
-            generation_config={"temperature": 0, "top_p": 0.1}
+            self.model_name,
+            generation_config=self.generation_config
         )
+        if use_cache and response_cache is None:
+            try:
+                response_cache = LLMResponseCache()
+            except Exception as e:
+                print(f"-> Кэш ответов недоступен, работаем без него: {e}")
+        self.response_cache = response_cache if use_cache else None
+        self.bypass_cache = bypass_cache
+
+    def _generate_text(self, prompt: str) -> tuple[str, bool]:
+        """Текст ответа модели: из кэша, если есть, иначе запрос к API. Возвращает (текст, из_кэша)"""
+        if self.response_cache and not self.bypass_cache:
+            cached = self.response_cache.get(self._cache_key(prompt))
+            if cached is not None:
+                return cached, True
+        self.rate_limiter.acquire()
+        return self.model.generate_content(prompt).text, False
+
+    def _cache_key(self, prompt: str) -> str:
+        return LLMResponseCache.make_key(self.model_name, self.generation_config, prompt)
+
+    def _cache_response(self, prompt: str, response_text: str):
+        """Сохраняет в кэш только ответ, который успешно распарсился"""
+        if self.response_cache:
+            try:
+                self.response_cache.put(self._cache_key(prompt), self.model_name, response_text)
+            except Exception as e:
+                print(f"-> Не удалось сохранить ответ в кэш: {e}")
 
     def _get_gemini_assessment(self, prompt: str, skill_name: str) -> dict:
-        response = None
+        response_text = None
         try:
-            response = self.model.generate_content(prompt)
-            json_response_text = response.text.strip().replace("```json", "").replace("```", "")
-            return json.loads(json_response_text)
+            response_text, from_cache = self._generate_text(prompt)
+            json_response_text = response_text.strip().replace("```json", "").replace("```", "")
+            result = json.loads(json_response_text)
+            if not from_cache:
+                self._cache_response(prompt, response_text)
+            return result
         except Exception as e:
             print(f"!!! Ошибка при обращении к Gemini API или парсинге JSON: {e}")
-            if response:
-                print(f"!!! Ответ от Gemini, который не удалось распарсить: {response.text}")
+            if response_text:
+                print(f"!!! Ответ от Gemini, который не удалось распарсить: {response_text}")
             return {"skill_assessed": skill_name, "score": 0, "assessment_comment": f"Ошибка оценки: {e}"}
 
-    def _score_skills(self, transcript_data: dict) -> tuple[float, float, list, list]:
+    def _build_skill_prompt(self, part: dict) -> str:
+        # Используем ручную замену вместо .format()
+        prompt = self.prompts["scoring"].replace("{{question_text}}", part.get("question", ""))
+        prompt = prompt.replace("{{candidate_answer}}", part.get("answer", ""))
+        prompt = prompt.replace("{{skill_being_assessed}}", part.get("skill_assessed", "unknown"))
+        return prompt
+
+    def _build_experience_prompt(self, transcript_data: dict) -> str:
+        # Используем ручную замену вместо .format()
+        prompt = self.prompts["experience"].replace("{{vacancy_info}}", json.dumps(transcript_data.get("vacancy_info", {}), ensure_ascii=False))
+        prompt = prompt.replace("{{resume_info}}", json.dumps(transcript_data.get("resume_info", {}), ensure_ascii=False))
+        prompt = prompt.replace("{{candidate_answer}}", transcript_data.get("experience_question_answer", "Кандидат не предоставил развернутого ответа об опыте."))
+        return prompt
+
+    def _build_batch_prompt(self, parts: list) -> str:
+        items = [{
+            "part_id": part_id,
+            "question_text": part.get("question", ""),
+            "candidate_answer": part.get("answer", ""),
+            "skill_assessed": part.get("skill_assessed", "unknown"),
+            "assessment_category": part.get("assessment_category")
+        } for part_id, part in parts]
+        return self.prompts["batch_scoring"].replace("{{dialogue_parts_json}}", json.dumps(items, ensure_ascii=False, indent=2))
+
+    def _make_batches(self, indexed_parts: list) -> list:
+        """Пакеты по длине текста: длинные ответы уходят меньшими пакетами, короткие - большими"""
+        batches, current, current_chars = [], [], 0
+        for part_id, part in indexed_parts:
+            part_chars = len(part.get("question", "")) + len(part.get("answer", ""))
+            if current and (current_chars + part_chars > self.batch_max_chars or len(current) >= self.batch_max_parts):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append((part_id, part))
+            current_chars += part_chars
+        if current:
+            batches.append(current)
+        return batches
+
+    def _assess_part(self, part_id: int, part: dict) -> list:
+        return [(part_id, self._get_gemini_assessment(self._build_skill_prompt(part), part.get("skill_assessed", "unknown")))]
+
+    def _assess_batch(self, parts: list) -> list:
+        """
+        Оценивает пакет частей одним запросом. Части, для которых ответ не распарсился
+        (нет элемента с part_id или нет целой оценки), оцениваются отдельными запросами.
+        """
+        if len(parts) == 1:
+            return self._assess_part(*parts[0])
+
+        parsed = {}
+        prompt = self._build_batch_prompt(parts)
+        response_text = None
+        try:
+            response_text, from_cache = self._generate_text(prompt)
+            json_response_text = response_text.strip().replace("```json", "").replace("```", "")
+            items = json.loads(json_response_text)
+            for item in items if isinstance(items, list) else []:
+                if isinstance(item, dict) and isinstance(item.get("score"), int):
+                    parsed[item.pop("part_id", None)] = item
+            # В кэш попадает только полностью разобранный пакет
+            if not from_cache and all(part_id in parsed for part_id, _ in parts):
+                self._cache_response(prompt, response_text)
+        except Exception as e:
+            print(f"!!! Ошибка пакетной оценки, части будут оценены по одной: {e}")
+            if response_text:
+                print(f"!!! Ответ от Gemini, который не удалось распарсить: {response_text}")
+
+        results = []
+        for part_id, part in parts:
+            if part_id in parsed:
+                results.append((part_id, parsed[part_id]))
+            else:
+                results += self._assess_part(part_id, part)
+        return results
+
+    def _score_skills(self, transcript_data: dict, progress_callback=None, executor: ThreadPoolExecutor = None) -> tuple[float, float, list, list]:
+        """
+        Части диалога оцениваются параллельно (в пакетном режиме - пакетами по несколько частей);
+        порядок оценок в отчете совпадает с порядком вопросов
+        """
         assessments = {"hard_skill": [], "soft_skill": []}
         dialogue_parts = transcript_data.get("dialogue_parts", [])
+        scored_parts = [part for part in dialogue_parts if part.get("assessment_category") in assessments]
+        indexed_parts = list(enumerate(scored_parts))
+        work_units = self._make_batches(indexed_parts) if self.batch_mode else [[item] for item in indexed_parts]
 
-        for part in dialogue_parts:
-            category = part.get("assessment_category")
-            if category in assessments:
-                skill_assessed = part.get("skill_assessed", "unknown")
-                print(f"-> Оцениваю навык: {skill_assessed}...")
-                
-                # Используем ручную замену вместо .format()
-                prompt = self.prompts["scoring"].replace("{{question_text}}", part.get("question", ""))
-                prompt = prompt.replace("{{candidate_answer}}", part.get("answer", ""))
-                prompt = prompt.replace("{{skill_being_assessed}}", skill_assessed)
-
-                gemini_result = self._get_gemini_assessment(prompt, skill_name=skill_assessed)
-                assessments[category].append(gemini_result)
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            futures = []
+            for unit in work_units:
+                for _, part in unit:
+                    print(f"-> Оцениваю навык: {part.get('skill_assessed', 'unknown')}...")
+                futures.append(executor.submit(self._assess_batch, unit))
+
+            results = {}
+            for future in as_completed(futures):
+                for part_id, result in future.result():
+                    results[part_id] = result
+                    if progress_callback:
+                        part = scored_parts[part_id]
+                        progress_callback("skill_scored", skill=part.get("skill_assessed", "unknown"),
+                                          category=part.get("assessment_category"),
+                                          score=result.get("score", 0),
+                                          index=len(results), total=len(scored_parts))
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True)
+
+        for part_id, part in indexed_parts:
+            assessments[part["assessment_category"]].append(results[part_id])
         
         hard_scores = [res.get("score", 0) for res in assessments["hard_skill"]]
         hard_score_percent = (sum(hard_scores) / (len(hard_scores) * 5)) * 100 if hard_scores else 0
@@ -59,28 +247,34 @@ class ScoringModelGemini:
         
         return hard_score_percent, soft_score_percent, assessments["hard_skill"], assessments["soft_skill"]
 
-    def _score_experience(self, transcript_data: dict) -> tuple[float, dict]:
-        print("-> Оцениваю опыт кандидата...")
-        
-        # Используем ручную замену вместо .format()
-        prompt = self.prompts["experience"].replace("{{vacancy_info}}", json.dumps(transcript_data.get("vacancy_info", {}), ensure_ascii=False))
-        prompt = prompt.replace("{{resume_info}}", json.dumps(transcript_data.get("resume_info", {}), ensure_ascii=False))
-        prompt = prompt.replace("{{candidate_answer}}", transcript_data.get("experience_question_answer", "Кандидат не предоставил развернутого ответа об опыте."))
-        
-        gemini_result = self._get_gemini_assessment(prompt, skill_name="Experience")
-        
+    def _experience_score(self, gemini_result: dict) -> float:
         scores = gemini_result.get("scores", {})
         avg_score_5 = sum(scores.values()) / len(scores) if scores else 0
         
         if gemini_result.get("contradiction_flag", False):
             avg_score_5 *= 0.7
 
-        final_percentage = (avg_score_5 / 5) * 100
-        return final_percentage, gemini_result
+        return (avg_score_5 / 5) * 100
+
+    def _score_experience(self, transcript_data: dict) -> tuple[float, dict]:
+        print("-> Оцениваю опыт кандидата...")
+        gemini_result = self._get_gemini_assessment(self._build_experience_prompt(transcript_data), skill_name="Experience")
+        return self._experience_score(gemini_result), gemini_result
 
-    def score(self, transcript_data: dict) -> dict:
-        hard_score_percent, soft_score_percent, hard_details, soft_details = self._score_skills(transcript_data)
-        experience_score_percent, experience_details = self._score_experience(transcript_data)
+    def score(self, transcript_data: dict, progress_callback=None) -> dict:
+        """
+        Оценка опыта и всех частей диалога выполняется одновременно (не больше max_concurrency
+        запросов сразу, с ограничением частоты). progress_callback(stage, **details) вызывается
+        после оценки каждого навыка и опыта.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            experience_future = executor.submit(self._score_experience, transcript_data)
+            hard_score_percent, soft_score_percent, hard_details, soft_details = self._score_skills(
+                transcript_data, progress_callback, executor=executor
+            )
+            experience_score_percent, experience_details = experience_future.result()
+        if progress_callback:
+            progress_callback("experience_scored", score_percent=round(experience_score_percent, 2))
         
         final_score = (hard_score_percent * self.weights['hard_skills'] +
                        experience_score_percent * self.weights['experience'] +
@@ -107,6 +301,7 @@ if __name__ == "__main__":
     transcript_path = base_path / "mocks" / "ds2" / "transcript_output.json"
     prompt_path = base_path / "ds3" / "scoring_prompt.md"
     exp_prompt_path = base_path / "ds3" / "experience_prompt.md"
+    batch_prompt_path = base_path / "ds3" / "batch_scoring_prompt.md"
     
     try:
         with open(transcript_path, 'r', encoding='utf-8') as f:
@@ -115,12 +310,14 @@ if __name__ == "__main__":
             scoring_prompt_template = f.read()
         with open(exp_prompt_path, 'r', encoding='utf-8') as f:
             experience_prompt_template = f.read()
+        with open(batch_prompt_path, 'r', encoding='utf-8') as f:
+            batch_prompt_template = f.read()
     except FileNotFoundError as e:
         print(f"Ошибка: Не найден файл: {e.filename}")
         exit()
 
     mock_weights = {"hard_skills": 0.5, "experience": 0.3, "soft_skills": 0.2}
-    prompts = {"scoring": scoring_prompt_template, "experience": experience_prompt_template}
+    prompts = {"scoring": scoring_prompt_template, "experience": experience_prompt_template, "batch_scoring": batch_prompt_template}
     
     print("--- Запуск скоринга кандидата с помощью Gemini ---")
     scorer = ScoringModelGemini(prompts=prompts, weights=mock_weights)
@@ -3,8 +3,9 @@ import { useParams } from 'react-router-dom';
 import './Interview.css';
 
 interface Message {
-  type: 'welcome' | 'transcript' | 'question' | 'interview_ended' | 'audio_response' | 'processing_completed' | 'info_received';
+  type: 'welcome' | 'transcript' | 'question_partial' | 'question' | 'interview_ended' | 'audio_response' | 'processing_completed' | 'processing_progress' | 'info_received';
   text?: string;
+  delta?: string;
   message?: string;
   is_final?: boolean;
   question_number?: number;
@@ -21,35 +22,49 @@ const Interview: React.FC = () => {
   const [isRecording, setIsRecording] = useState(false);
   const [messages, setMessages] = useState<Message[]>([]);
   const [currentTranscript, setCurrentTranscript] = useState('');
+  // Текст вопроса, пока он генерируется (кадры question_partial)
+  const [currentQuestion, setCurrentQuestion] = useState('');
   const [processingResult, setProcessingResult] = useState<any>(null);
   const [candidateName, setCandidateName] = useState('');
   const [showNameInput, setShowNameInput] = useState(true);
   
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const audioChunksRef = useRef<Blob[]>([]);
+  // Очередь воспроизведения: сервер присылает аудио вопроса по предложениям
+  const audioQueueRef = useRef<Promise<void>>(Promise.resolve());
 
-  // Функция для воспроизведения аудио ответа
+  // Воспроизведение аудио ответа: фрагменты проигрываются строго друг за другом
+  const playAudioBytes = (bytes: ArrayBuffer | Uint8Array) => {
+    const blob = new Blob([bytes], { type: 'audio/mp3' });
+    const audioUrl = URL.createObjectURL(blob);
+    
+    audioQueueRef.current = audioQueueRef.current.then(() => new Promise<void>(resolve => {
+      const audio = new Audio(audioUrl);
+      
+      // Очищаем URL после воспроизведения
+      audio.onended = () => {
+        URL.revokeObjectURL(audioUrl);
+        resolve();
+      };
+      audio.play().catch(e => {
+        console.error('Audio play error:', e);
+        resolve();
+      });
+    }));
+  };
+
+  // Аудио в base64 внутри JSON (старый протокол)
   const playAudioResponse = (audioBase64: string) => {
     try {
-      // Декодируем base64 в blob
+      // Декодируем base64 в массив байт
       const audioData = atob(audioBase64);
-      const arrayBuffer = new ArrayBuffer(audioData.length);
-      const uint8Array = new Uint8Array(arrayBuffer);
+      const uint8Array = new Uint8Array(audioData.length);
       
       for (let i = 0; i < audioData.length; i++) {
         uint8Array[i] = audioData.charCodeAt(i);
       }
       
-      const blob = new Blob([uint8Array], { type: 'audio/mp3' });
-      const audioUrl = URL.createObjectURL(blob);
-      
-      const audio = new Audio(audioUrl);
-      audio.play().catch(e => console.error('Audio play error:', e));
-      
-      // Очищаем URL после воспроизведения
-      audio.onended = () => {
-        URL.revokeObjectURL(audioUrl);
-      };
+      playAudioBytes(uint8Array);
     } catch (error) {
       console.error('Audio decoding error:', error);
     }
@@ -59,7 +74,9 @@ const Interview: React.FC = () => {
   useEffect(() => {
     if (!sessionId) return;
 
-    const websocket = new WebSocket(`ws://localhost:8001/ws/interview/${sessionId}`);
+    // Бинарный протокол: аудио идет сырыми байтами в binary кадрах, управление - JSON
+    const websocket = new WebSocket(`ws://localhost:8001/ws/interview/${sessionId}?audio_protocol=binary`);
+    websocket.binaryType = 'arraybuffer';
     
     websocket.onopen = () => {
       console.log('[WebSocket] Подключение установлено');
@@ -67,6 +84,12 @@ const Interview: React.FC = () => {
     };
 
     websocket.onmessage = (event) => {
+      if (event.data instanceof ArrayBuffer) {
+        // Бинарный кадр с аудио следует за JSON заголовком audio_response
+        playAudioBytes(event.data);
+        return;
+      }
+      
       const message: Message = JSON.parse(event.data);
       console.log('[WebSocket] Получено:', message);
       
@@ -84,7 +107,13 @@ const Interview: React.FC = () => {
           }
           break;
           
+        case 'question_partial':
+          // Накопленный текст вопроса показываем до прихода финального кадра question
+          setCurrentQuestion(message.text || '');
+          break;
+          
         case 'question':
+          setCurrentQuestion('');
           setMessages(prev => [...prev, message]);
           break;
           
@@ -100,6 +129,10 @@ const Interview: React.FC = () => {
           setIsRecording(false);
           break;
           
+        case 'processing_progress':
+          // Ход фоновой обработки (этапы доступны и по REST /api/interview/jobs/{job_id})
+          break;
+          
         case 'processing_completed':
           setMessages(prev => [...prev, {
             type: 'interview_ended',
@@ -173,20 +206,8 @@ const Interview: React.FC = () => {
           
           // Отправляем реальные аудио данные через WebSocket
           if (ws && ws.readyState === WebSocket.OPEN) {
-            const reader = new FileReader();
-            reader.onload = () => {
-              const arrayBuffer = reader.result as ArrayBuffer;
-              const uint8Array = new Uint8Array(arrayBuffer);
-              const binaryString = Array.from(uint8Array, byte => String.fromCharCode(byte)).join('');
-              const base64 = btoa(binaryString);
-              
-              ws.send(JSON.stringify({
-                type: 'audio_chunk',
-                data: base64,
-                size: event.data.size
-              }));
-            };
-            reader.readAsArrayBuffer(event.data);
+            // Сырые байты без base64 - сервер принимает binary кадр как audio_chunk
+            ws.send(event.data);
           }
         }
       };
@@ -360,6 +381,12 @@ const Interview: React.FC = () => {
                 ))}
               </div>
               
+              {currentQuestion && (
+                <div className="message message-question">
+                  <p><strong>Вопрос:</strong> {currentQuestion}</p>
+                </div>
+              )}
+              
               {currentTranscript && (
                 <div className="current-transcript">
                   <p><strong>Сейчас говорите:</strong> {currentTranscript}</p>
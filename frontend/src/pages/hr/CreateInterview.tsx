@@ -22,9 +22,11 @@ const CreateInterview: React.FC = () => {
     }
   } 
 
-  const uploadFiles = async (files: File[]) => {
+  // kind=resume: сервер сразу ставит PDF резюме в очередь разбора, вакансии только сохраняются
+  const uploadFiles = async (files: File[], kind: 'resume' | 'file' = 'file') => {
     const formData = new FormData();
     files.forEach(file => formData.append('files', file));
+    formData.append('kind', kind);
   const response = await fetch('http://localhost:8000/api/hr/upload-multi', {
       method: 'POST',
       body: formData
@@ -45,7 +47,7 @@ const CreateInterview: React.FC = () => {
       // Загружаем вакансии
       const jobDescLinks = await uploadFiles(jobDescriptions);
       // Загружаем резюме
-      const resumeLinks = await uploadFiles(resumes);
+      const resumeLinks = await uploadFiles(resumes, 'resume');
       // Формируем данные для API создания собеседования
       const interviewData = {
         position,